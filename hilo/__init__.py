@@ -0,0 +1,17 @@
+"""Hi-Lo 게임 로직 패키지."""
+from .cards import (
+    ACE, BLACK_SUITS, CARD_DISPLAY, CARD_RANK, CARDS, DECK_SIZE, RANK_MAP, RANKS, RED_SUITS, SUITS,
+    card_code, card_html_table, create_deck, get_card_display, shuffle_decks,
+)
+from .engine import (
+    BET_TYPES, HISTORY_SIZE, ODDS_CACHE_SIZE, ODDS_CAP, ODDS_FIXED, BetResult, HiLoEngine, calculate_odds,
+    is_winning_bet, odds_cache_clear, odds_cache_info, odds_for_count, odds_for_fingerprint, odds_from_split,
+    payout_for,
+)
+from .ledger import Account, Ledger, LedgerError
+from .shoe import MAX_DECKS, MIN_DECKS, Shoe, new_seed
+from .sessionlog import SessionLog
+from .sessionstats import SessionStats
+from .shoepool import PoolStats, ShoePool, pool_stats
+from .state import GameState
+from .store import GameSession, MemoryStore, SQLiteStore, StateConflict, open_store
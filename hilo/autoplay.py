@@ -0,0 +1,67 @@
+"""서버 쪽 자동 플레이. 전략 하나로 N 라운드를 엔진에서 바로 돌린다 (클릭 / rerun 없이).
+
+규칙과 전략 해석은 시뮬레이터와 같다.
+- 게임마다 strategy.chip 을 걸고, Likely 면 calculate_odds 로 확률 높은 쪽에 건다.
+- 팟이 chip * cash_out_at 이상이 되거나 이긴 횟수가 max_bets 에 닿으면 인출한다.
+- 버스트하면 바로 새 게임을 시작한다.
+원장 / 라운드 로그에는 손으로 한 것과 같이 기록된다.
+"""
+from collections import deque, namedtuple
+
+from .strategy import choose_bet, should_cash_out, validate_strategy
+
+MAX_ROUNDS = 1000 # 한 번에 돌릴 수 있는 라운드 수
+TRACE_SIZE = 50 # trace 에 남길 최근 라운드 수
+
+AutoRound = namedtuple("AutoRound", ["game", "bet", "card", "next_card", "odds", "win", "pot"])
+AutoPlayResult = namedtuple("AutoPlayResult", [
+    "rounds", "games", "cash_outs", "busts", "staked", "returned", "net", "balance", "stopped", "trace",
+])
+
+
+def auto_play(game, strategy, rounds, trace_size=TRACE_SIZE):
+    """game(HiLoEngine) 으로 최대 rounds 번 베팅한다. 잔액이 칩보다 적어지면 멈춘다.
+
+    끝날 때 진행 중인 게임은 그대로 둔다 (팟이 남아 있으면 이어서 하거나 인출할 수 있다).
+    """
+    validate_strategy(strategy)
+    if not 0 < rounds <= MAX_ROUNDS:
+        raise ValueError(f"rounds must be 1..{MAX_ROUNDS}, got {rounds}")
+    worth_before = game.balance + game.current_pot
+    trace = deque(maxlen=trace_size)
+    played = games = cash_outs = busts = staked = returned = 0
+    wins_in_game = 0
+    stopped = "rounds"
+
+    if game.bust_state:
+        game.reset_game_state()
+    if game.current_pot > 0: # 손으로 하던 게임은 이어서 한다
+        games, staked = 1, game.total_invested
+
+    while played < rounds:
+        if game.current_pot <= 0:
+            if not game.add_chip(strategy.chip):
+                stopped = "balance"
+                break
+            games += 1
+            staked += strategy.chip
+            wins_in_game = 0
+
+        odds_1, odds_2 = game.calculate_odds()
+        bet = choose_bet(strategy.bet, odds_1, odds_2)
+        result = game.process_bet(bet)
+        played += 1
+        trace.append(AutoRound(games, bet, result.current_card, result.next_card, result.payout_mult, result.win,
+                               result.pot if result.win else 0))
+
+        if not result.win:
+            busts += 1
+            game.reset_game_state()
+            continue
+        wins_in_game += 1
+        if should_cash_out(strategy, result.pot, wins_in_game):
+            returned += game.cash_out()
+            cash_outs += 1
+
+    net = game.balance + game.current_pot - worth_before
+    return AutoPlayResult(played, games, cash_outs, busts, staked, returned, net, game.balance, stopped, list(trace))
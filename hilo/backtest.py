@@ -0,0 +1,190 @@
+"""멀티프로세스 전략 백테스트. 게임마다 HiLoEngine 의 calculate_odds / process_bet / cash_out 을 그대로 부른다.
+
+simulator 는 규칙을 NumPy 로 다시 짠 빠른 근사판이고, 이쪽은 엔진 규칙 자체를 검증하는 느린 정답판이다.
+- 게임을 chunk 개씩 나눈 작업마다 SeedSequence 에서 갈라진 seed 하나 (워커 수와 무관하게 같은 seed 면 같은 결과).
+- 작업 결과(합계, 제곱합)를 마지막에 합쳐 RTP 와 게임당 버스트율의 신뢰구간을 낸다.
+- --odds-fixed / --odds-cap 은 워커 프로세스 안의 engine.ODDS_FIXED / ODDS_CAP 만 바꾼다.
+
+    python -m hilo.backtest --games 1000000 --bet Red --cash-out-at 3 --odds-fixed 1.97
+"""
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from . import engine
+from .engine import BET_TYPES, HiLoEngine
+from .shoe import new_seed
+from .strategy import LIKELY, STRATEGY_BETS, Strategy, choose_bet, should_cash_out, validate_strategy
+
+CHUNK = 20_000 # 작업 하나의 게임 수
+
+# 작업 하나의 합계. 합치기만 하면 되도록 평균이 아니라 합을 들고 다닌다.
+Partial = namedtuple("Partial", ["games", "rounds", "returned", "busts", "sum_mult", "sum_mult_sq",
+                                 "wins_by_bet", "rounds_by_bet"])
+
+BacktestResult = namedtuple("BacktestResult", [
+    "games", "rounds", "staked", "returned", "rtp", "rtp_ci", "bust_rate", "bust_rate_ci", "round_bust_rate",
+    "mean_multiplier", "std_multiplier", "wins_by_bet", "rounds_by_bet", "confidence", "odds_fixed", "odds_cap",
+])
+
+
+def _init_worker(odds_fixed, odds_cap):
+    # payout_for / odds_for_count 는 호출 때마다 모듈 상수를 읽는다. 워커 프로세스 안에서만 바뀐다.
+    engine.ODDS_FIXED = odds_fixed
+    engine.ODDS_CAP = odds_cap
+    engine.odds_cache_clear() # fork 로 부모의 캐시를 물려받았을 수 있다
+
+
+def run_games(strategy, games, seed, num_decks=2, penetration=1.0, continuous=False):
+    """엔진 하나로 games 게임을 끝까지 (인출 또는 버스트) 진행한 Partial. 게임마다 새 슈에서 chip 하나로 시작."""
+    game = HiLoEngine(balance=0, num_decks=num_decks, seed=seed, penetration=penetration, continuous=continuous)
+    chip = strategy.chip
+    rounds = returned = busts = 0
+    sum_mult = sum_mult_sq = 0.0
+    wins_by_bet = [0] * len(BET_TYPES)
+    rounds_by_bet = [0] * len(BET_TYPES)
+
+    for _ in range(games):
+        game.balance = chip
+        game.add_chip(chip)
+        wins = 0
+        while True:
+            bet = choose_bet(strategy.bet, *game.calculate_odds())
+            result = game.process_bet(bet)
+            index = BET_TYPES.index(bet)
+            rounds_by_bet[index] += 1
+            if not result.win:
+                busts += 1
+                game.reset_game_state()
+                break
+            wins += 1
+            wins_by_bet[index] += 1
+            if should_cash_out(strategy, result.pot, wins):
+                pot = game.cash_out()
+                returned += pot
+                mult = pot / chip
+                sum_mult += mult
+                sum_mult_sq += mult * mult
+                break
+        rounds += wins + (not result.win)
+
+    return Partial(games, rounds, returned, busts, sum_mult, sum_mult_sq, wins_by_bet, rounds_by_bet)
+
+
+def _run_task(args):
+    return run_games(*args)
+
+
+def wilson_interval(successes, n, z):
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * (p * (1 - p) / n + z * z / (4 * n * n)) ** 0.5 / denom
+    return center - half, center + half
+
+
+def merge(partials, strategy, confidence, odds_fixed, odds_cap):
+    games = sum(p.games for p in partials)
+    rounds = sum(p.rounds for p in partials)
+    returned = sum(p.returned for p in partials)
+    busts = sum(p.busts for p in partials)
+    wins_by_bet = np.sum([p.wins_by_bet for p in partials], axis=0).tolist()
+    rounds_by_bet = np.sum([p.rounds_by_bet for p in partials], axis=0).tolist()
+
+    # 칩이 게임마다 같으므로 RTP 는 게임당 배수(최종 팟 / chip)의 평균이다
+    mean_mult = sum(p.sum_mult for p in partials) / games
+    var_mult = max(sum(p.sum_mult_sq for p in partials) / games - mean_mult * mean_mult, 0.0)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half = z * (var_mult / games) ** 0.5
+    return BacktestResult(
+        games=games,
+        rounds=rounds,
+        staked=strategy.chip * games,
+        returned=returned,
+        rtp=mean_mult,
+        rtp_ci=(mean_mult - half, mean_mult + half),
+        bust_rate=busts / games,
+        bust_rate_ci=wilson_interval(busts, games, z),
+        round_bust_rate=busts / rounds if rounds else 0.0,
+        mean_multiplier=mean_mult,
+        std_multiplier=var_mult ** 0.5,
+        wins_by_bet=dict(zip(BET_TYPES, wins_by_bet)),
+        rounds_by_bet=dict(zip(BET_TYPES, rounds_by_bet)),
+        confidence=confidence,
+        odds_fixed=odds_fixed,
+        odds_cap=odds_cap,
+    )
+
+
+def backtest(strategy, games, num_decks=2, penetration=1.0, continuous=False, seed=None, workers=None,
+             chunk=CHUNK, confidence=0.95, odds_fixed=engine.ODDS_FIXED, odds_cap=engine.ODDS_CAP):
+    """games 게임을 workers 개 프로세스에 나눠 돌리고 합친 BacktestResult."""
+    validate_strategy(strategy)
+    seeds = np.random.SeedSequence(seed).spawn((games + chunk - 1) // chunk)
+    tasks = []
+    for i, child in enumerate(seeds):
+        n = min(chunk, games - i * chunk)
+        tasks.append((strategy, n, new_seed(np.random.default_rng(child)), num_decks, penetration, continuous))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(odds_fixed, odds_cap)) as pool:
+        partials = list(pool.map(_run_task, tasks))
+    return merge(partials, strategy, confidence, odds_fixed, odds_cap)
+
+
+def format_result(result):
+    level = f"{result.confidence:.0%}"
+    lines = [
+        f"games        {result.games:,}",
+        f"rounds       {result.rounds:,}",
+        f"payouts      Red/Black x{result.odds_fixed}, Hi/Lo cap x{result.odds_cap}",
+        f"RTP          {result.rtp:.4%}  ({level} CI {result.rtp_ci[0]:.4%} .. {result.rtp_ci[1]:.4%})",
+        f"house edge   {1 - result.rtp:.4%}",
+        f"bust rate    {result.bust_rate:.4%}  ({level} CI {result.bust_rate_ci[0]:.4%} .. "
+        f"{result.bust_rate_ci[1]:.4%}) per game, {result.round_bust_rate:.4%} per round",
+        f"multiplier   mean {result.mean_multiplier:.4f}, std {result.std_multiplier:.4f}",
+        "win rate by bet:",
+    ]
+    for bet in BET_TYPES:
+        rounds = result.rounds_by_bet[bet]
+        if rounds:
+            lines.append(f"  {bet:<6} {result.wins_by_bet[bet] / rounds:8.4%} of {rounds:,}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hi-Lo multiprocess strategy backtest (engine rules)")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--bet", choices=STRATEGY_BETS, default=LIKELY)
+    parser.add_argument("--cash-out-at", type=float, default=2.0)
+    parser.add_argument("--max-bets", type=int, default=None)
+    parser.add_argument("--chip", type=int, default=1000)
+    parser.add_argument("--decks", type=int, default=2)
+    parser.add_argument("--penetration", type=float, default=1.0)
+    parser.add_argument("--continuous", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="default: CPU count")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="games per task")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--odds-fixed", type=float, default=engine.ODDS_FIXED)
+    parser.add_argument("--odds-cap", type=float, default=engine.ODDS_CAP)
+    args = parser.parse_args(argv)
+
+    strategy = Strategy(args.bet, args.cash_out_at, args.max_bets, args.chip)
+    start = time.perf_counter()
+    result = backtest(strategy, args.games, num_decks=args.decks, penetration=args.penetration,
+                      continuous=args.continuous, seed=args.seed, workers=args.workers, chunk=args.chunk,
+                      confidence=args.confidence, odds_fixed=args.odds_fixed, odds_cap=args.odds_cap)
+    elapsed = time.perf_counter() - start
+    print(format_result(result))
+    print(f"elapsed      {elapsed:.2f}s ({result.rounds / elapsed:,.0f} rounds/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""엔진 핫패스 마이크로 벤치마크와 AppTest 기반 화면 rerun 지연 측정.
+
+    python -m hilo.bench                        # 전체 실행, 표 출력
+    python -m hilo.bench --output bench.json    # JSON 저장
+    python -m hilo.bench --compare base.json    # 이전 결과와 비교
+    python -m hilo.bench --skip-e2e             # 엔진만
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .cards import create_deck
+from .engine import HiLoEngine
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APPS = ("app.py", "ap1.py", "mapp.py")
+E2E_ACTIONS = ("load", "chip", "bet", "cash_out", "bust")
+
+
+def _time_per_op(func, number, repeat):
+    """func 를 number 번 호출하는 측정을 repeat 번 하고 가장 빠른 회차의 호출당 ns."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / number
+
+
+def micro_benchmarks(number=20_000, repeat=5):
+    engine = HiLoEngine(balance=10**15)
+    engine.add_chip(1000)
+
+    def draw_card():
+        engine.draw_card() # 컷 카드에 닿으면 draw_card 가 새 슈로 바꾼다
+
+    def calculate_odds():
+        engine.calculate_odds()
+
+    def process_bet():
+        # 버스트하면 같은 슈에서 팟만 되살려 reset_game_state 비용이 섞이지 않게 한다
+        if engine.bust_state or engine.current_pot > 10**9:
+            engine.bust_state = False
+            engine.current_pot = 1000
+        engine.process_bet("Red")
+
+    cases = {
+        "create_deck": lambda: create_deck(2),
+        "draw_card": draw_card,
+        "calculate_odds": calculate_odds,
+        "process_bet": process_bet,
+        "reset_game_state": engine.reset_game_state,
+    }
+    results = {}
+    for name, func in cases.items():
+        ns = _time_per_op(func, number, repeat)
+        results[name] = {"ns_per_op": round(ns, 1), "ops_per_sec": round(1e9 / ns)}
+    return results
+
+
+def _button(at, prefix):
+    for button in at.button:
+        if prefix in str(button.label):
+            return button
+    raise LookupError(f"button not found: {prefix!r}")
+
+
+def _timed_run(at, button=None):
+    start = time.perf_counter()
+    if button is not None:
+        button.click()
+    at.run(timeout=30)
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception}")
+    return elapsed
+
+
+def _bet_until(at, want_win, limit=200):
+    """Red 에 베팅해 원하는 결과(승/버스트)가 나온 클릭의 지연을 반환. 반대 결과면 새 게임으로."""
+    for _ in range(limit):
+        game = at.session_state.game
+        if game.bust_state:
+            at.session_state.game.bust_at -= 60 # 버스트 표시 시간 건너뛰기
+            _timed_run(at)
+            game = at.session_state.game
+        if game.current_pot <= 0:
+            _timed_run(at, _button(at, "+1k"))
+        elapsed = _timed_run(at, _button(at, "Red"))
+        game = at.session_state.game
+        busted = game.bust_state or game.current_pot == 0 # mapp.py 는 버스트 즉시 새 게임
+        if busted != want_win:
+            return elapsed
+    raise RuntimeError("no matching outcome")
+
+
+def e2e_benchmarks(apps=APPS, rounds=10):
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for app in apps:
+        path = str(REPO_ROOT / app)
+        samples = {action: [] for action in E2E_ACTIONS}
+        for _ in range(rounds):
+            at = AppTest.from_file(path, default_timeout=30)
+            samples["load"].append(_timed_run(at))
+            samples["chip"].append(_timed_run(at, _button(at, "+1k")))
+            samples["bet"].append(_bet_until(at, want_win=True))
+            if at.session_state.game.current_pot <= 0:
+                _bet_until(at, want_win=True)
+            samples["cash_out"].append(_timed_run(at, _button(at, "IN CHUL")))
+            samples["bust"].append(_bet_until(at, want_win=False))
+        results[app] = {action: _summary(values) for action, values in samples.items()}
+    return results
+
+
+def _summary(seconds):
+    ms = sorted(s * 1000 for s in seconds)
+    p95 = ms[min(len(ms) - 1, round(0.95 * (len(ms) - 1)))]
+    return {"median_ms": round(statistics.median(ms), 3), "p95_ms": round(p95, 3), "n": len(ms)}
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(skip_e2e=False, apps=APPS, rounds=10, number=20_000):
+    result = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "micro": micro_benchmarks(number=number),
+    }
+    if not skip_e2e:
+        import streamlit
+        result["meta"]["streamlit"] = streamlit.__version__
+        result["e2e"] = e2e_benchmarks(apps=apps, rounds=rounds)
+    return result
+
+
+def _rows(result):
+    """(이름, 값, 단위) 목록. 비교와 출력에 공통으로 사용."""
+    rows = [(f"micro/{name}", r["ns_per_op"], "ns") for name, r in result.get("micro", {}).items()]
+    for app, actions in result.get("e2e", {}).items():
+        rows += [(f"e2e/{app}/{action}", r["median_ms"], "ms") for action, r in actions.items()]
+    return rows
+
+
+def format_result(result, baseline=None):
+    base = {name: value for name, value, _ in _rows(baseline)} if baseline else {}
+    lines = []
+    for name, value, unit in _rows(result):
+        line = f"{name:<28} {value:>12,.1f} {unit}"
+        if name in base and base[name]:
+            line += f"   {value / base[name]:6.2f}x vs base"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hi-Lo benchmarks")
+    parser.add_argument("--output", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--skip-e2e", action="store_true")
+    parser.add_argument("--apps", nargs="+", default=list(APPS))
+    parser.add_argument("--rounds", type=int, default=10, help="앱별 e2e 반복 횟수")
+    parser.add_argument("--number", type=int, default=20_000, help="마이크로 벤치마크 호출 횟수")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    result = run(skip_e2e=args.skip_e2e, apps=args.apps, rounds=args.rounds, number=args.number)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_result(result, baseline))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
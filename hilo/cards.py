@@ -0,0 +1,51 @@
+"""카드 상수, 카드 코드 테이블, 덱 생성.
+
+카드는 0~51 의 1바이트 코드로 표현한다. code = (rank - 2) * 4 + suit 인덱스.
+셔플은 전역 random 대신 호출자가 넘긴 numpy Generator(PCG64)를 쓴다. 세션마다 자기 Generator 를 가진다.
+"""
+import numpy as np
+
+SUITS = ['♠', '♣', '♥', '♦']
+RED_SUITS = ['♥', '♦']
+BLACK_SUITS = ['♠', '♣']
+RANKS = list(range(2, 15)) # 2~14 (Ace=14)
+RANK_MAP = {11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
+ACE = 14
+
+DECK_SIZE = len(RANKS) * len(SUITS)
+SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+
+# 코드 -> 값 조회 테이블 (52칸)
+CARDS = tuple((r, s) for r in RANKS for s in SUITS)
+CARD_RANK = bytes(r for r, _ in CARDS)
+CARD_IS_RED = bytes(s in RED_SUITS for _, s in CARDS)
+CARD_DISPLAY = tuple(
+    (RANK_MAP.get(r, str(r)), s, "red" if s in RED_SUITS else "black") for r, s in CARDS
+)
+DECK_CODES = bytes(range(DECK_SIZE))
+_DECK_ARRAY = np.frombuffer(DECK_CODES, dtype=np.uint8)
+
+
+def card_code(rank, suit):
+    return (rank - 2) * 4 + SUIT_INDEX[suit]
+
+
+def get_card_display(rank, suit):
+    return CARD_DISPLAY[card_code(rank, suit)]
+
+
+def create_deck(num_decks=2, rng=None):
+    """섞인 카드 코드 bytearray. rng 가 없으면 OS 엔트로피로 새 Generator 를 만든다."""
+    if rng is None:
+        rng = np.random.default_rng()
+    return bytearray(rng.permutation(np.tile(_DECK_ARRAY, num_decks)).tobytes())
+
+
+def shuffle_decks(num_decks, count, rng):
+    """슈 count 개를 한 번에 섞은 (count, 52 * num_decks) uint8 배열. 행마다 독립 셔플."""
+    return rng.permuted(np.tile(_DECK_ARRAY, (count, num_decks)), axis=1)
+
+
+def card_html_table(template):
+    """카드 코드별로 미리 채운 HTML 조각 (52칸). template 은 {rank}, {suit}, {color} 를 쓴다."""
+    return tuple(template.format(rank=r, suit=s, color=c) for r, s, c in CARD_DISPLAY)
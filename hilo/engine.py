@@ -0,0 +1,257 @@
+"""Hi-Lo 게임 엔진. Streamlit 없이 동작하며 app.py / ap1.py / mapp.py 가 공통으로 사용한다."""
+from collections import deque, namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from .cards import ACE, BLACK_SUITS, RED_SUITS, card_code
+from .shoe import RANK_BITS, Shoe, new_seed, validate_shoe
+from .state import HISTORY_SIZE, GameState
+
+ODDS_FIXED = 1.95 # Red / Black 고정 배당
+ODDS_CAP = 50.0   # Hi / Lo 배당 상한
+BET_TYPES = ("Hi", "Lo", "Red", "Black")
+ODDS_CACHE_SIZE = 16384 # 프로세스 전체 배당 캐시 항목 수 (LRU)
+_RANK_MASK = (1 << RANK_BITS) - 1
+
+# process_bet 결과. win=False 이면 버스트. shuffled=True 면 이번 draw 로 컷 카드가 나와 새 슈로 바뀌었다.
+BetResult = namedtuple("BetResult", ["win", "current_card", "next_card", "payout_mult", "pot", "shuffled"],
+                       defaults=(False,))
+
+
+def odds_for_count(count, total):
+    """이길 카드가 total 장 중 count 장일 때의 배당. round(.., 2) 후 ODDS_CAP 으로 자른다."""
+    prob = count / total
+    odds = round(1 / prob, 2) if prob > 0 else 0.0
+    return min(odds, ODDS_CAP)
+
+
+def odds_from_split(current_rank, low_count, same_count, high_count):
+    """rank 미만/동일/초과 장수로 (odds_1, odds_2). Ace 이면 (Same, Under), 아니면 (Over, Under)."""
+    total = low_count + same_count + high_count
+    if total == 0: return 1.0, 1.0
+
+    if current_rank == ACE: # Ace 특수 룰
+        count_1, count_2 = same_count, low_count
+    else: # 일반 룰 (Tie 포함)
+        count_1, count_2 = high_count + same_count, low_count + same_count
+
+    return odds_for_count(count_1, total), odds_for_count(count_2, total)
+
+
+@lru_cache(maxsize=ODDS_CACHE_SIZE)
+def odds_for_fingerprint(current_rank, fingerprint):
+    """슈 구성 fingerprint(Shoe.fingerprint) 기준 (odds_1, odds_2). 모든 세션이 같은 캐시를 쓴다.
+
+    슈 앞쪽의 구성은 플레이어마다 자주 겹치므로 대부분 캐시에서 나간다. lru_cache 라 스레드에 안전하다.
+    """
+    low = same = total = 0
+    for rank in range(2, ACE + 1):
+        count = (fingerprint >> (RANK_BITS * (rank - 2))) & _RANK_MASK
+        if rank < current_rank: low += count
+        elif rank == current_rank: same = count
+        total += count
+    return odds_from_split(current_rank, low, same, total - low - same)
+
+
+def odds_cache_info():
+    """(hits, misses, maxsize, currsize)."""
+    return odds_for_fingerprint.cache_info()
+
+
+def odds_cache_clear():
+    odds_for_fingerprint.cache_clear()
+
+
+def calculate_odds(current_rank, shoe):
+    """남은 슈 기준 (odds_1, odds_2)."""
+    return odds_for_fingerprint(current_rank, shoe.fingerprint)
+
+
+def payout_for(bet_type, odds):
+    if bet_type in ("Red", "Black"):
+        return ODDS_FIXED
+    return odds[0] if bet_type == "Hi" else odds[1]
+
+
+def is_winning_bet(bet_type, current_rank, next_rank, next_suit):
+    if bet_type == "Red":
+        return next_suit in RED_SUITS
+    if bet_type == "Black":
+        return next_suit in BLACK_SUITS
+    if current_rank == ACE:
+        if bet_type == "Hi": return next_rank == ACE # Same
+        if bet_type == "Lo": return next_rank < ACE  # Under
+    else:
+        if bet_type == "Hi": return next_rank >= current_rank # Over
+        if bet_type == "Lo": return next_rank <= current_rank # Under
+    return False
+
+
+class HiLoEngine(GameState):
+    """한 플레이어의 게임 규칙. 상태 필드와 직렬화는 GameState, 메시지 문구(message)는 각 화면(app)이 정한다.
+
+    ledger 가 주어지면 잔액이 바뀌는 동작(add_chip, process_bet, cash_out, reset_balance)마다 한 건씩 기록한다.
+    round_log 가 주어지면 process_bet 마다 감사용 바이너리 레코드를 하나 남긴다.
+    session_log(SessionLog) 가 주어지면 process_bet 마다 세션 전체 기록에 한 줄 쌓는다.
+    session_stats(SessionStats) 가 주어지면 add_chip / process_bet / cash_out 마다 누적 통계를 고친다.
+    history 는 화면용 최근 HISTORY_SIZE 장 (deque, 새 카드가 앞).
+
+    슈 seed 는 세션 전용 Generator(PCG64, seed=self.seed)에서 뽑는다. 같은 seed 면 슈 순서 전체가 재현되고,
+    개별 슈는 Shoe(num_decks, deck.seed) 로 다시 만들 수 있다. shoe_pool 이 주어지면 미리 섞인 슈를 가져다 쓴다
+    (이때 seed 는 풀이 정하고, 슈마다 deck.seed 로 재현된다).
+    """
+
+    __slots__ = ("ledger", "player_id", "round_log", "shoe_pool", "session_log", "session_stats")
+
+    def __init__(self, balance=1000000, num_decks=2, ledger=None, player_id=None, round_log=None, seed=None,
+                 shoe_pool=None, penetration=1.0, continuous=False, session_log=None, session_stats=None):
+        self.balance = balance
+        self.message = ""
+        self.bust_at = 0.0
+        self.seed = new_seed() if seed is None else seed
+        self.rng = np.random.default_rng(self.seed)
+        self.configure_shoe(num_decks, penetration, continuous, shoe_pool)
+        self.ledger = ledger
+        self.player_id = player_id
+        self.round_log = round_log
+        self.session_log = session_log
+        self.session_stats = session_stats
+        self.reset_game_state()
+
+    @classmethod
+    def from_bytes(cls, data, ledger=None, player_id=None, round_log=None, shoe_pool=None, session_log=None,
+                   session_stats=None):
+        """GameState.to_bytes 로 저장한 상태에 원장 / 로그 / 풀을 다시 붙인 엔진."""
+        engine = super().from_bytes(data)
+        engine.configure_shoe(engine.num_decks, engine.penetration, engine.continuous, shoe_pool)
+        engine.ledger = ledger
+        engine.player_id = player_id
+        engine.round_log = round_log
+        engine.session_log = session_log
+        engine.session_stats = session_stats
+        return engine
+
+    @classmethod
+    def restore(cls, ledger, player_id, balance=1000000, **kwargs):
+        """원장의 요약 행으로 잔액과 팟을 되살린 엔진. 기록이 없으면 balance 로 새로 시작한다."""
+        engine = cls(balance=balance, ledger=ledger, player_id=player_id, **kwargs)
+        account = ledger.account(player_id)
+        if account is None:
+            engine.reset_balance(balance)
+        else:
+            engine.balance, engine.current_pot, engine.total_invested = account
+        return engine
+
+    def _record(self, kind, amount, detail=""):
+        if self.ledger is None: return
+        pot, invested = (0, 0) if self.bust_state else (self.current_pot, self.total_invested)
+        self.ledger.record(self.player_id, kind, amount, self.balance, pot, invested, detail)
+
+    def reset_game_state(self):
+        """게임을 재시작. 보유머니는 유지."""
+        self.deck = self._new_shoe()
+        self.current_card = self.deck.draw()
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.current_pot = 0
+        self.total_invested = 0
+        self.bust_state = False
+
+    def configure_shoe(self, num_decks=2, penetration=1.0, continuous=False, shoe_pool=None):
+        """슈 설정 변경. 다음 reset_game_state 부터 적용된다."""
+        validate_shoe(num_decks, penetration)
+        if shoe_pool is not None and shoe_pool.spec != (num_decks, penetration, continuous):
+            raise ValueError(f"shoe pool {shoe_pool.spec} does not match {(num_decks, penetration, continuous)}")
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.continuous = continuous
+        self.shoe_pool = shoe_pool
+
+    def reset_balance(self, balance):
+        """보유머니를 balance 로 바꾸고 게임을 재시작."""
+        self.balance = balance
+        self.reset_game_state()
+        self._record("reset", balance)
+
+    def _new_shoe(self):
+        if self.shoe_pool is not None:
+            return self.shoe_pool.take()
+        return Shoe(self.num_decks, new_seed(self.rng), self.penetration, self.continuous)
+
+    def draw_card(self):
+        """한 장 뽑는다. 컷 카드에 닿으면 바로 새 슈로 바꿔서 다음 배당이 실제로 뽑을 슈 기준이 되게 한다."""
+        card = self.deck.draw()
+        if self.deck.needs_shuffle:
+            self.deck = self._new_shoe()
+        return card
+
+    def calculate_odds(self, current_rank=None):
+        if current_rank is None:
+            current_rank = self.current_card[0]
+        return calculate_odds(current_rank, self.deck)
+
+    def payout_multiplier(self, bet_type, odds=None):
+        return payout_for(bet_type, odds if odds is not None else self.calculate_odds())
+
+    def add_chip(self, amount):
+        """잔액이 충분하면 팟에 칩을 추가하고 True. 버스트 상태나 잔액 부족이면 False."""
+        if self.bust_state: return False
+        if self.balance < amount: return False
+        self.balance -= amount
+        self.current_pot += amount
+        self.total_invested += amount
+        self._record("chip", amount)
+        if self.session_stats is not None:
+            self.session_stats.chip(amount)
+        return True
+
+    def cash_out(self):
+        """팟을 보유머니로 옮기고 게임을 재시작. 인출한 금액(없으면 0)을 반환."""
+        if self.bust_state: return 0
+        win_amount = self.current_pot
+        if win_amount <= 0: return 0
+        invested = self.total_invested
+        self.balance += win_amount
+        self.reset_game_state()
+        self._record("cash_out", win_amount)
+        if self.session_stats is not None:
+            self.session_stats.cash_out(win_amount, invested)
+        return win_amount
+
+    def process_bet(self, bet_type):
+        """베팅 1회 진행. 진행할 수 없으면 None, 아니면 BetResult."""
+        if self.bust_state: return None
+        if self.current_pot <= 0: return None
+        if bet_type not in BET_TYPES:
+            raise ValueError(f"unknown bet type: {bet_type!r}")
+
+        current_card = self.current_card
+        current_rank = current_card[0]
+        split = self.deck.rank_split(current_rank)
+        payout_mult = payout_for(bet_type, odds_from_split(current_rank, *split))
+
+        deck = self.deck
+        next_card = self.draw_card()
+        win = is_winning_bet(bet_type, current_rank, next_card[0], next_card[1])
+
+        pot_before = self.current_pot
+        if win:
+            self.current_pot = int(self.current_pot * payout_mult)
+        else:
+            self.bust_state = True
+        # amount 는 팟 증감. 버스트면 잃은 팟 전체
+        self._record("bet", self.current_pot - pot_before if win else -pot_before,
+                     f"{bet_type} x{payout_mult} {'win' if win else 'bust'}")
+        pot_after = self.current_pot if win else 0
+        if self.round_log is not None:
+            self.round_log.append(self.player_id, card_code(*current_card), BET_TYPES.index(bet_type),
+                                  card_code(*next_card), win, split, payout_mult, pot_before, pot_after)
+        if self.session_log is not None:
+            self.session_log.append(card_code(*current_card), BET_TYPES.index(bet_type), card_code(*next_card), win,
+                                    pot_before, pot_after)
+        if self.session_stats is not None:
+            self.session_stats.bet(BET_TYPES.index(bet_type), win)
+
+        self.history.appendleft(current_card)
+        self.current_card = next_card
+        return BetResult(win, current_card, next_card, payout_mult, self.current_pot, self.deck is not deck)
@@ -0,0 +1,222 @@
+"""플레이어별 잔액과 라운드 기록을 남기는 SQLite 원장.
+
+- entries: add_chip / 베팅 결과 / cash_out / 초기화마다 한 줄 (append-only, kind = chip / bet / cash_out / reset)
+- accounts: 플레이어별 요약 행 (balance, current_pot, total_invested). entries 와 같은 트랜잭션에서 갱신한다.
+
+record() 는 큐에 넣기만 하고, 쓰기 스레드가 batch_size 건 또는 flush_interval 초마다 모아서 한 트랜잭션으로
+커밋한다. WAL + synchronous=NORMAL 이라 커밋마다 fsync 하지 않는다 (체크포인트 때만). 프로세스가 죽어도
+커밋된 건은 남고, 전원이 나가면 마지막 몇 트랜잭션이 사라질 수 있다.
+
+커밋이 실패하면 (예: busy_timeout 뒤의 database is locked) 롤백하고 그 배치를 들고 있다가 다음 배치 앞에 붙여
+다시 시도한다. 그동안 flush() 는 LedgerError 를 낸다.
+
+잔액 조회는 accounts 행 하나를 읽으므로 기록 건수와 무관하게 상수 시간이다. 매번 SQLite 를 읽으므로 다른 워커
+프로세스가 커밋한 기록도 바로 보인다 (WAL 이라 읽기는 쓰기를 기다리지 않는다). 이 프로세스에서 record() 했지만 아직
+커밋되지 않은 플레이어만 메모리의 마지막 요약을 돌려준다.
+"""
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_PATH = os.environ.get("HILO_LEDGER", "hilo_ledger.db")
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.05 # 초
+RETRY_INTERVAL = 1.0 # 초. 커밋 실패 뒤 다시 시도할 때까지
+STOP_RETRIES = 3 # close() 때 남은 배치를 버리기 전 시도 횟수
+
+log = logging.getLogger(__name__)
+
+Account = namedtuple("Account", ["balance", "current_pot", "total_invested"])
+Entry = namedtuple("Entry", ["id", "player", "ts", "kind", "amount", "balance", "current_pot", "total_invested", "detail"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    balance INTEGER NOT NULL,
+    current_pot INTEGER NOT NULL,
+    total_invested INTEGER NOT NULL,
+    detail TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS entries_player ON entries (player, id);
+CREATE TABLE IF NOT EXISTS accounts (
+    player TEXT PRIMARY KEY,
+    balance INTEGER NOT NULL,
+    current_pot INTEGER NOT NULL,
+    total_invested INTEGER NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+_INSERT_ENTRY = ("INSERT INTO entries (player, ts, kind, amount, balance, current_pot, total_invested, detail) "
+                 "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_UPSERT_ACCOUNT = ("INSERT INTO accounts (player, balance, current_pot, total_invested, updated) VALUES (?, ?, ?, ?, ?) "
+                   "ON CONFLICT (player) DO UPDATE SET balance = excluded.balance, current_pot = excluded.current_pot, "
+                   "total_invested = excluded.total_invested, updated = excluded.updated")
+
+_STOP = object()
+
+
+class LedgerError(Exception):
+    """쓰기 스레드가 기록을 커밋하지 못했다 (또는 멈췄다)."""
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+class Ledger:
+    """프로세스 하나에 하나. 여러 세션(스크립트 스레드)이 같이 써도 된다."""
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._reader = _connect(path)
+        self._reader.executescript(_SCHEMA)
+        self._read_lock = threading.Lock()
+        self._unsaved = {} # player -> [Account, 아직 커밋되지 않은 기록 수]
+        self._unsaved_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._error = None # 마지막 커밋 실패. 성공하면 None
+        self._writer = threading.Thread(target=self._write_loop, name="hilo-ledger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --- 기록 ---
+    def record(self, player, kind, amount, balance, current_pot, total_invested, detail=""):
+        """기록 한 건을 큐에 넣는다. 디스크 커밋은 쓰기 스레드가 묶어서 하고, 그 전까지 account() 는 이 요약을 돌려준다."""
+        account = Account(balance, current_pot, total_invested)
+        with self._unsaved_lock:
+            unsaved = self._unsaved.setdefault(player, [account, 0])
+            unsaved[0] = account
+            unsaved[1] += 1
+        self._queue.put((player, time.time(), kind, amount, balance, current_pot, total_invested, detail))
+
+    def flush(self):
+        """지금까지 record() 한 건이 모두 커밋될 때까지 기다린다. 커밋이 실패했거나 쓰기 스레드가 멈췄으면 LedgerError."""
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(RETRY_INTERVAL):
+            if not self._writer.is_alive():
+                raise LedgerError("ledger writer is not running")
+        error = self._error
+        if error is not None:
+            raise LedgerError(f"ledger commit failed: {error}") from error
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+        atexit.unregister(self.close)
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        pending = [] # 커밋하지 못한 기록. 다음 배치 앞에 붙여 다시 시도한다
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=RETRY_INTERVAL if pending else None)
+                except queue.Empty:
+                    item = None # 새 기록은 없지만 pending 을 다시 시도한다
+                batch, waiters, stop = pending, [], False
+                deadline = time.monotonic() + self.flush_interval
+                while item is not None:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        batch.append(item)
+                    if stop or waiters or len(batch) >= self.batch_size:
+                        break
+                    timeout = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                pending = self._try_commit(conn, batch, STOP_RETRIES if stop else 1) if batch else []
+                for event in waiters:
+                    event.set()
+                if stop:
+                    if pending:
+                        log.error("ledger closed with %d uncommitted records", len(pending))
+                    return
+        finally:
+            conn.close()
+
+    def _try_commit(self, conn, batch, attempts):
+        """batch 를 커밋하고 남은 기록(실패하면 batch 그대로, 성공하면 빈 목록)을 돌려준다."""
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(RETRY_INTERVAL)
+            try:
+                self._commit(conn, batch)
+            except sqlite3.Error as e:
+                log.warning("ledger commit of %d records failed: %s", len(batch), e)
+                self._error = e
+            else:
+                self._error = None
+                self._saved(batch)
+                return []
+        return batch
+
+    def _saved(self, batch):
+        # 커밋된 기록만큼 세고, 남은 기록이 없는 플레이어는 다음 조회부터 SQLite 를 읽는다
+        with self._unsaved_lock:
+            for record in batch:
+                unsaved = self._unsaved[record[0]]
+                unsaved[1] -= 1
+                if unsaved[1] == 0:
+                    del self._unsaved[record[0]]
+
+    @staticmethod
+    def _commit(conn, batch):
+        # 플레이어별 마지막 기록만 요약 행으로
+        latest = {}
+        for player, ts, _, _, balance, pot, invested, _ in batch:
+            latest[player] = (player, balance, pot, invested, ts)
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(_INSERT_ENTRY, batch)
+            conn.executemany(_UPSERT_ACCOUNT, latest.values())
+            conn.execute("COMMIT")
+        except BaseException:
+            # COMMIT 이 busy 로 실패해도 트랜잭션이 열린 채 남는다
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    # --- 조회 ---
+    def account(self, player):
+        """요약 행. 기록이 없는 플레이어면 None. 다른 프로세스가 커밋한 기록도 반영된다."""
+        with self._unsaved_lock:
+            unsaved = self._unsaved.get(player)
+            if unsaved is not None:
+                return unsaved[0]
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT balance, current_pot, total_invested FROM accounts WHERE player = ?", (player,)).fetchone()
+        return None if row is None else Account(*row)
+
+    def entries(self, player, limit=50):
+        """최근 기록부터 최대 limit 건. 아직 커밋되지 않은 건은 flush() 후에 보인다."""
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT id, player, ts, kind, amount, balance, current_pot, total_invested, detail FROM entries "
+                "WHERE player = ? ORDER BY id DESC LIMIT ?", (player, limit)).fetchall()
+        return [Entry(*row) for row in rows]
@@ -0,0 +1,256 @@
+"""여러 플레이어 세션을 동시에 돌리는 로컬 부하 발생기.
+
+AppTest 는 실행할 때마다 프로세스 전역 Runtime 을 바꿔 끼우므로 한 프로세스 안에서는 rerun 을 하나씩만 돌릴 수
+있다. 그래서 워커 프로세스(--workers) 여러 개를 띄우고 플레이어를 나눠 맡긴다. 워커끼리는 락 없이 동시에 돌고,
+원장 / 라운드 로그는 여러 streamlit 워커처럼 같은 파일 / 디렉터리를 같이 쓴다.
+
+워커 안에서는 맡은 플레이어를 돌아가며 한 번씩 클릭한다. 플레이어는 직전 클릭이 끝나자마자 다음 클릭을 내므로
+(생각 시간 0) 클릭마다 시간을 둘로 나눠 잰다.
+- wait: 클릭을 낸 뒤 같은 워커의 다른 세션 rerun 이 끝나기를 기다린 시간 (서버의 대기열에 해당)
+- exec: rerun 자체 시간
+latency 는 둘의 합이다. --workers 를 --players 와 같게 주면 wait 는 0 이고 exec 만 남는다.
+
+메모리는 워커마다 첫 세션을 띄운 뒤부터 늘어난 RSS 를 나머지 세션 수로 나눈다 (rss_per_session_kb). 여기에는
+AppTest 가 세션마다 들고 있는 요소 트리도 들어가므로, 앱이 세션마다 들고 있는 상태(GameState 직렬화 크기 +
+SessionLog 배열)는 app_state_per_session_kb 로 따로 적는다.
+
+    python -m hilo.loadtest --app mapp.py --players 200 --actions 30 --workers 8
+    python -m hilo.loadtest --mix chip=3,hi=2,lo=2,red=1,black=1,cash_out=1 --output load.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MIX = {"chip": 3, "hi": 2, "lo": 2, "red": 1, "black": 1, "cash_out": 1}
+
+# 행동 -> 앱별 버튼 key 후보 (app.py / ap1.py, mapp.py 순)
+ACTION_KEYS = {
+    "chip": ("chip_1000", "c_1000"),
+    "hi": ("bet_hi", "hi"),
+    "lo": ("bet_lo", "lo"),
+    "red": ("bet_red", "re"),
+    "black": ("bet_black", "bl"),
+    "cash_out": ("cash_out",),
+}
+CASH_OUT_LABEL = "IN CHUL" # mapp.py 의 인출 버튼은 key 가 없다
+BARRIER_TIMEOUT = 600
+
+_BARRIER = None # 워커 프로세스마다 _init_worker 가 채운다
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTION_KEYS:
+            raise ValueError(f"unknown action in mix: {name!r}")
+        mix[name] = float(weight)
+    return mix
+
+
+def rss_bytes():
+    """현재 프로세스 RSS. /proc 이 없으면 최대 RSS 로 대신한다."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1)))]
+
+
+def _find_button(at, action):
+    keys = {b.key: b for b in at.button}
+    for key in ACTION_KEYS[action]:
+        if key in keys:
+            return keys[key]
+    if action == "cash_out":
+        for button in at.button:
+            if CASH_OUT_LABEL in str(button.label):
+                return button
+    raise LookupError(f"no button for {action!r}")
+
+
+class Player:
+    """AppTest 세션 하나와 행동 선택용 난수."""
+
+    def __init__(self, app_path, seed):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(app_path, default_timeout=60)
+        self.rng = random.Random(seed)
+        self.samples = [] # (행동, 대기 초, rerun 초)
+        self.ready = None # 다음 클릭을 낸 시각 (직전 rerun 이 끝난 시각)
+
+    def start(self):
+        self.ready = time.perf_counter()
+        self._run("load")
+
+    def _run(self, action, button=None):
+        began = time.perf_counter()
+        if button is not None:
+            button.click()
+        self.at.run()
+        end = time.perf_counter()
+        self.samples.append((action, began - self.ready, end - began))
+        self.ready = end
+        if self.at.exception:
+            raise RuntimeError(f"app raised: {self.at.exception}")
+
+    def step(self, actions, weights):
+        game = self.at.session_state.game
+        if game.bust_state:
+            # 버스트 표시 시간이 지난 것으로 보고 fragment 타이머 대신 rerun
+            self.at.session_state.game.bust_at -= 60
+            self._run("bust_reset")
+            return
+        action = self.rng.choices(actions, weights)[0]
+        self._run(action, _find_button(self.at, action))
+
+
+def _init_worker(barrier):
+    global _BARRIER
+    _BARRIER = barrier
+
+
+def _play(app_path, seeds, actions, names, weights):
+    """워커 프로세스 하나. seeds 마다 플레이어를 띄우고, 모든 워커가 준비되면 돌아가며 actions 번씩 클릭한다."""
+    try:
+        players = [Player(app_path, seed) for seed in seeds]
+        players[0].start()
+        rss_first = rss_bytes() # 모듈 / 캐시 / 풀 등 프로세스 공통 비용은 첫 세션에 몰린다
+        for player in players[1:]:
+            player.start()
+        _BARRIER.wait(BARRIER_TIMEOUT) # 모든 워커의 세션이 뜬 뒤 동시에 시작
+    except BaseException:
+        _BARRIER.abort() # 다른 워커가 barrier 에서 영원히 기다리지 않도록
+        raise
+    start = time.perf_counter()
+    for player in players:
+        player.ready = start
+    for _ in range(actions):
+        for player in players:
+            player.step(names, weights)
+    elapsed = time.perf_counter() - start
+    rss = rss_bytes()
+    return {
+        "samples": [sample for player in players for sample in player.samples],
+        "seconds": elapsed,
+        "rss": rss,
+        "extra_sessions": len(players) - 1,
+        "extra_rss": rss - rss_first,
+        "app_state": [len(p.at.session_state.game.to_bytes()) + p.at.session_state.game.session_log.nbytes
+                      for p in players],
+    }
+
+
+def run_load(app="app.py", players=50, actions=20, mix=None, seed=0, workers=None):
+    mix = mix or DEFAULT_MIX
+    names, weights = list(mix), list(mix.values())
+    app_path = str(REPO_ROOT / app)
+    workers = min(players, workers or os.cpu_count() or 1)
+
+    # spawn: 워커마다 streamlit / 앱 모듈을 새로 읽는다 (부모의 스레드 / 캐시를 fork 로 물려받지 않도록)
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(barrier,)) as executor:
+        futures = [executor.submit(_play, app_path, [seed + i for i in range(w, players, workers)], actions,
+                                   names, weights) for w in range(workers)]
+        results = [future.result() for future in futures]
+    wall = max(result["seconds"] for result in results)
+
+    by_action, waits, execs = {}, [], []
+    for result in results:
+        for action, wait, run in result["samples"]:
+            by_action.setdefault(action, []).append((wait + run) * 1000)
+            if action != "load":
+                waits.append(wait * 1000)
+                execs.append(run * 1000)
+    clicks = sorted(ms for action, values in by_action.items() if action != "load" for ms in values)
+    extra_sessions = sum(result["extra_sessions"] for result in results)
+    app_state = [size for result in results for size in result["app_state"]]
+
+    return {
+        "app": app,
+        "players": players,
+        "workers": workers,
+        "actions_per_player": actions,
+        "mix": mix,
+        "wall_seconds": round(wall, 3),
+        "throughput_reruns_per_sec": round(len(clicks) / wall, 1),
+        "latency_ms": _latency(clicks),
+        "wait_ms": _latency(sorted(waits)),
+        "exec_ms": _latency(sorted(execs)),
+        "latency_by_action_ms": {action: _latency(sorted(v)) for action, v in sorted(by_action.items())},
+        "rss_mb": round(sum(result["rss"] for result in results) / 2**20, 1),
+        # 워커마다 세션이 하나뿐이면 첫 세션과 나눌 수 없다
+        "rss_per_session_kb": (round(sum(result["extra_rss"] for result in results) / extra_sessions / 1024, 1)
+                               if extra_sessions else None),
+        "app_state_per_session_kb": round(sum(app_state) / len(app_state) / 1024, 1),
+    }
+
+
+def _latency(sorted_ms):
+    return {
+        "p50": round(percentile(sorted_ms, 0.50), 2),
+        "p95": round(percentile(sorted_ms, 0.95), 2),
+        "p99": round(percentile(sorted_ms, 0.99), 2),
+        "n": len(sorted_ms),
+    }
+
+
+def format_report(report):
+    per_session = report["rss_per_session_kb"]
+    lines = [
+        f"{report['app']}: {report['players']} players x {report['actions_per_player']} actions "
+        f"on {report['workers']} workers in {report['wall_seconds']:.1f}s",
+        f"throughput   {report['throughput_reruns_per_sec']:,.1f} reruns/s",
+    ]
+    for name in ("latency", "wait", "exec"):
+        r = report[f"{name}_ms"]
+        lines.append(f"{name:<12} p50 {r['p50']:.1f} ms  p95 {r['p95']:.1f} ms  p99 {r['p99']:.1f} ms")
+    lines.append(f"memory       {report['rss_mb']:.1f} MB RSS over workers, "
+                 + (f"{per_session:,.1f} KB per session with harness, " if per_session is not None else "")
+                 + f"{report['app_state_per_session_kb']:,.1f} KB app state per session")
+    for action, r in report["latency_by_action_ms"].items():
+        lines.append(f"  {action:<11} n={r['n']:<6} p50 {r['p50']:8.1f}  p95 {r['p95']:8.1f}  p99 {r['p99']:8.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hi-Lo multi-session load generator")
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--actions", type=int, default=20, help="플레이어당 클릭 수")
+    parser.add_argument("--mix", type=parse_mix, default=None,
+                        help="행동별 가중치, 예: chip=3,hi=2,lo=2,red=1,black=1,cash_out=1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수, 최대 --players)")
+    parser.add_argument("--output", help="결과 JSON 경로")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    report = run_load(app=args.app, players=args.players, actions=args.actions, mix=args.mix, seed=args.seed,
+                      workers=args.workers)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""핫 패스 / 화면 구역별 지연 히스토그램 (옵트인).
+
+꺼져 있을 때:
+- 엔진 메서드는 원래 함수 그대로다 (enable() 때만 클래스 속성을 타이머로 감싼다).
+- laps() 는 아무것도 하지 않는 함수 하나를 돌려준다.
+
+켜면 호출 수 / 누적 시간 / 버킷별 개수를 모으고, Prometheus 텍스트 형식으로 파일에 주기적으로 쓴다.
+앱은 HILO_METRICS=<파일 경로> 환경변수로 켠다.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import namedtuple
+
+from .engine import HiLoEngine, odds_cache_info
+from .shoepool import pool_stats
+
+# 초 단위 버킷 경계 (10µs ~ 1s). 마지막 +Inf 는 따로 센다.
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0)
+ENGINE_METHODS = ("process_bet", "calculate_odds", "draw_card", "reset_game_state")
+EXPORT_INTERVAL = 5.0 # 초
+
+SectionStats = namedtuple("SectionStats", ["name", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+
+
+def _no_lap(name):
+    pass
+
+
+class Histogram:
+    __slots__ = ("name", "counts", "count", "total", "max", "_lock")
+
+    def __init__(self, name):
+        self.name = name
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """버킷 안에서 선형 보간한 분위수 (초). 마지막 버킷은 max 까지로 본다."""
+        with self._lock:
+            counts, count, top = list(self.counts), self.count, self.max
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i else 0.0
+                high = min(BUCKETS[i], top) if i < len(BUCKETS) else top
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return top
+
+    def stats(self):
+        ms = 1000
+        return SectionStats(self.name, self.count, self.total / self.count * ms if self.count else 0.0,
+                            self.quantile(0.5) * ms, self.quantile(0.95) * ms, self.quantile(0.99) * ms,
+                            self.max * ms)
+
+
+def _timed(function, histogram):
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    timed.__wrapped__ = function
+    timed.__name__ = function.__name__
+    timed.__doc__ = function.__doc__
+    return timed
+
+
+class Metrics:
+    """구역 이름별 Histogram 모음. 프로세스에 하나(METRICS)를 두고 모든 세션이 같이 쓴다."""
+
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._patched = [] # (cls, name, 원래 함수)
+        self._stop = threading.Event()
+        self._exporter = None
+
+    def histogram(self, name):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram(name))
+        return histogram
+
+    def laps(self):
+        """구역이 끝날 때마다 lap(name) 을 부르면 직전 lap 이후의 시간을 name 에 기록한다.
+
+            lap = METRICS.laps()
+            ...히스토리...
+            lap("history")
+
+        꺼져 있으면 아무것도 하지 않는 함수를 돌려준다.
+        """
+        if not self.enabled:
+            return _no_lap
+        last = time.perf_counter()
+        def lap(name):
+            nonlocal last
+            now = time.perf_counter()
+            self.histogram(name).observe(now - last)
+            last = now
+        return lap
+
+    def instrument(self, cls, names):
+        """cls 의 메서드들을 타이머로 감싼다. disable() 이 원래대로 돌려놓는다."""
+        for name in names:
+            function = cls.__dict__[name]
+            setattr(cls, name, _timed(function, self.histogram(name)))
+            self._patched.append((cls, name, function))
+
+    def enable(self, path=None, interval=EXPORT_INTERVAL):
+        """엔진 메서드를 감싸고, path 가 있으면 interval 초마다 Prometheus 텍스트 파일을 쓴다."""
+        with self._lock:
+            if self.enabled:
+                return
+            self.enabled = True
+        self.instrument(HiLoEngine, ENGINE_METHODS)
+        self.path = path
+        if path:
+            self._stop.clear()
+            self._exporter = threading.Thread(target=self._export_loop, args=(interval,),
+                                              name="hilo-metrics", daemon=True)
+            self._exporter.start()
+
+    def disable(self):
+        with self._lock:
+            if not self.enabled:
+                return
+            self.enabled = False
+        while self._patched:
+            cls, name, function = self._patched.pop()
+            setattr(cls, name, function)
+        if self._exporter is not None:
+            self._stop.set()
+            self._exporter.join()
+            self._exporter = None
+            self.write()
+
+    def _snapshot(self):
+        with self._lock:
+            return list(self._histograms.values())
+
+    def reset(self):
+        for histogram in self._snapshot():
+            with histogram._lock:
+                histogram.counts = [0] * (len(BUCKETS) + 1)
+                histogram.count, histogram.total, histogram.max = 0, 0.0, 0.0
+
+    def stats(self):
+        """호출된 구역의 SectionStats 목록 (누적 시간 큰 순)."""
+        histograms = sorted(self._snapshot(), key=lambda h: h.total, reverse=True)
+        return [histogram.stats() for histogram in histograms if histogram.count]
+
+    def to_prometheus(self):
+        lines = ["# HELP hilo_section_seconds Time spent in a Hi-Lo engine call or UI section.",
+                 "# TYPE hilo_section_seconds histogram"]
+        for histogram in sorted(self._snapshot(), key=lambda h: h.name):
+            name = histogram.name
+            with histogram._lock:
+                counts, count, total = list(histogram.counts), histogram.count, histogram.total
+            cumulative = 0
+            for le, n in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += n
+                lines.append(f'hilo_section_seconds_bucket{{section="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'hilo_section_seconds_sum{{section="{name}"}} {total!r}')
+            lines.append(f'hilo_section_seconds_count{{section="{name}"}} {count}')
+        # 배당 캐시는 계측을 켜지 않아도 항상 센다
+        cache = odds_cache_info()
+        lines += ["# HELP hilo_odds_cache_requests_total Odds cache lookups by result.",
+                  "# TYPE hilo_odds_cache_requests_total counter",
+                  f'hilo_odds_cache_requests_total{{result="hit"}} {cache.hits}',
+                  f'hilo_odds_cache_requests_total{{result="miss"}} {cache.misses}',
+                  "# HELP hilo_odds_cache_entries Odds cache entries in use.",
+                  "# TYPE hilo_odds_cache_entries gauge",
+                  f"hilo_odds_cache_entries {cache.currsize}"]
+        # 슈 풀도 항상 센다. 슈 설정(덱 수, 컷 카드, 연속 셔플)마다 한 줄
+        pools = [(f'num_decks="{p.num_decks}",penetration="{p.penetration}",'
+                  f'continuous="{str(p.continuous).lower()}"', p) for p in pool_stats()]
+        lines += ["# HELP hilo_shoe_pool_depth Pre-shuffled shoes waiting in the pool.",
+                  "# TYPE hilo_shoe_pool_depth gauge"]
+        lines += [f"hilo_shoe_pool_depth{{{labels}}} {p.depth}" for labels, p in pools]
+        lines += ["# HELP hilo_shoe_pool_capacity Pool size the refill thread fills up to.",
+                  "# TYPE hilo_shoe_pool_capacity gauge"]
+        lines += [f"hilo_shoe_pool_capacity{{{labels}}} {p.capacity}" for labels, p in pools]
+        lines += ["# HELP hilo_shoe_pool_taken_total Shoes handed out by the pool.",
+                  "# TYPE hilo_shoe_pool_taken_total counter"]
+        lines += [f"hilo_shoe_pool_taken_total{{{labels}}} {p.taken}" for labels, p in pools]
+        lines += ["# HELP hilo_shoe_pool_misses_total Shoes shuffled on the request path because the pool was empty.",
+                  "# TYPE hilo_shoe_pool_misses_total counter"]
+        lines += [f"hilo_shoe_pool_misses_total{{{labels}}} {p.misses}" for labels, p in pools]
+        lines += ["# HELP hilo_shoe_pool_produced_total Shoes shuffled by the refill thread.",
+                  "# TYPE hilo_shoe_pool_produced_total counter"]
+        lines += [f"hilo_shoe_pool_produced_total{{{labels}}} {p.produced}" for labels, p in pools]
+        lines += ["# HELP hilo_shoe_pool_refill_rate Shoes per second while the refill thread is busy.",
+                  "# TYPE hilo_shoe_pool_refill_rate gauge"]
+        lines += [f"hilo_shoe_pool_refill_rate{{{labels}}} {p.refill_rate!r}" for labels, p in pools]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=None):
+        """Prometheus 텍스트 파일로 쓴다. 임시 파일에 쓰고 바꿔치기하므로 읽는 쪽이 반쪽 파일을 보지 않는다."""
+        path = path or self.path
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def _export_loop(self, interval):
+        while not self._stop.wait(interval):
+            self.write()
+
+
+METRICS = Metrics()
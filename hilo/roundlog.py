@@ -0,0 +1,315 @@
+"""라운드(베팅 1회)마다 64바이트 고정폭 레코드를 남기는 append-only 바이너리 로그와 리플레이 검증기.
+
+레코드 (little-endian, 64 bytes)
+    ts_ns q | session 16s | current B | bet B | next B | win B | low H | same H | high H | 6x |
+    odds d | pot_before q | pot_after q
+
+current / next 는 카드 코드(0~51), bet 은 BET_TYPES 인덱스. low / same / high 는 베팅 시점 슈의
+rank_split 이라 Hi/Lo 배당을 다시 계산할 수 있다. 버스트면 pot_after = 0.
+
+append() 는 레코드를 pack 해서 deque 에 넣기만 한다. 쓰기 스레드가 flush_interval 마다 모아서 파일에 쓰고,
+파일이 max_bytes 를 넘기 전에 다음 번호 파일(rounds-<pid>-000002.log ...)로 넘어간다. 헤더는 파일을 열 때 바로 쓰고,
+남은 레코드는 종료 때 (atexit) close() 가 쓴다. 마지막 레코드가 잘린 파일은 이어 쓰기 전에 잘린 부분을 버린다.
+
+여러 워커 프로세스가 같은 디렉터리에 써도 되도록 파일 이름에 pid 를 넣어 프로세스마다 따로 쓴다. 파일은 연 동안
+flock 으로 잡아 두고, 다른 프로세스(예: 다른 컨테이너의 같은 pid)가 잡고 있으면 다음 번호로 넘어간다.
+
+    python -m hilo.roundlog round_logs/            # 디렉터리 안의 로그 전체 검증
+    python -m hilo.roundlog round_logs/rounds-4242-000003.log --session <player id> --show 20
+"""
+import argparse
+import atexit
+import fcntl
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from .cards import ACE, CARD_IS_RED, CARD_RANK, CARDS, DECK_SIZE, get_card_display
+from .engine import BET_TYPES, ODDS_FIXED
+from .simulator import odds_table
+
+DEFAULT_DIR = os.environ.get("HILO_ROUND_LOG", "round_logs")
+MAX_BYTES = 64 * 2**20
+FLUSH_INTERVAL = 0.2 # 초
+
+MAGIC = b"HILORND1"
+RECORD = struct.Struct("<q16sBBBBHHH6xdqq")
+HEADER = struct.Struct("<8sH54x")
+RECORD_SIZE = RECORD.size # 64
+HEADER_SIZE = HEADER.size # 64
+
+# RECORD 와 같은 배치의 numpy dtype (리플레이용)
+RECORD_DTYPE = np.dtype([
+    ("ts_ns", "<i8"), ("session", "S16"), ("current", "u1"), ("bet", "u1"), ("next", "u1"), ("win", "u1"),
+    ("low", "<u2"), ("same", "<u2"), ("high", "<u2"), ("_pad", "V6"),
+    ("odds", "<f8"), ("pot_before", "<i8"), ("pot_after", "<i8"),
+])
+assert RECORD_DTYPE.itemsize == RECORD_SIZE
+
+HI, LO, RED, BLACK = (BET_TYPES.index(b) for b in ("Hi", "Lo", "Red", "Black"))
+CHUNK_RECORDS = 1 << 20 # 리플레이 때 한 번에 검증할 레코드 수
+
+ReplayResult = namedtuple("ReplayResult", ["files", "records", "mismatches", "bad_win", "bad_odds", "bad_pot",
+                                           "seconds", "bad_records"])
+
+
+def session_key(player_id):
+    """플레이어 id -> 16바이트. uuid hex 면 그대로 디코드, 아니면 UTF-8 을 잘라 채운다."""
+    if player_id is None:
+        return bytes(16)
+    try:
+        key = bytes.fromhex(player_id)
+    except ValueError:
+        key = b""
+    if len(key) != 16:
+        key = player_id.encode("utf-8")[:16].ljust(16, b"\0")
+    return key
+
+
+def log_files(paths):
+    """파일 / 디렉터리 목록 -> 로그 파일 경로 (디렉터리는 프로세스별 번호 순)."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("rounds-*.log")) if path.is_dir() else [path])
+    return files
+
+
+class RoundLog:
+    """프로세스 하나에 하나. 여러 세션이 같이 append 해도 된다."""
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=MAX_BYTES, flush_interval=FLUSH_INTERVAL):
+        if max_bytes < HEADER_SIZE + RECORD_SIZE:
+            raise ValueError("max_bytes too small for one record")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._pending = deque()
+        self._file_lock = threading.Lock()
+        self._file = None
+        self._pid = os.getpid()
+        existing = sorted(self.directory.glob(f"rounds-{self._pid}-*.log"))
+        self._index = int(existing[-1].stem.rsplit("-", 1)[1]) if existing else 1
+        self._open()
+        self._stop = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="hilo-roundlog", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @property
+    def path(self):
+        return self.directory / f"rounds-{self._pid}-{self._index:06d}.log"
+
+    def _open(self):
+        while True:
+            self._file = open(self.path, "ab")
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                # 같은 이름을 다른 프로세스가 쓰고 있다
+                self._file.close()
+                self._index += 1
+        self._size = self._file.tell()
+        if self._size < HEADER_SIZE:
+            self._file.truncate(0)
+            self._file.write(HEADER.pack(MAGIC, RECORD_SIZE))
+            self._file.flush()
+            self._size = HEADER_SIZE
+        elif (self._size - HEADER_SIZE) % RECORD_SIZE:
+            # 지난 프로세스가 레코드를 쓰다 죽었다. 잘린 레코드 뒤에 붙이면 이후 레코드가 모두 어긋난다
+            self._size -= (self._size - HEADER_SIZE) % RECORD_SIZE
+            self._file.truncate(self._size)
+
+    def _rotate(self):
+        self._file.close()
+        self._index += 1
+        self._open()
+
+    # --- 기록 ---
+    def append(self, player_id, current_code, bet_index, next_code, win, split, odds, pot_before, pot_after):
+        """레코드 한 건. pack 후 deque 에 넣기만 하고 바로 돌아온다."""
+        self._pending.append(RECORD.pack(time.time_ns(), session_key(player_id), current_code, bet_index, next_code, win,
+                                         *split, odds, pot_before, pot_after))
+
+    def flush(self):
+        """쌓인 레코드를 지금 파일에 쓴다."""
+        with self._file_lock:
+            self._drain()
+            self._file.flush()
+
+    def close(self):
+        self._stop.set()
+        self._writer.join()
+        with self._file_lock:
+            if not self._file.closed:
+                self._drain()
+                self._file.close()
+        atexit.unregister(self.close)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _drain(self):
+        pending = self._pending
+        records = []
+        while pending:
+            records.append(pending.popleft())
+        while records:
+            room = (self.max_bytes - self._size) // RECORD_SIZE
+            if room == 0:
+                self._rotate()
+                continue
+            chunk, records = records[:room], records[room:]
+            self._file.write(b"".join(chunk))
+            self._size += len(chunk) * RECORD_SIZE
+
+
+# --- 리플레이 ---
+def read_records(path):
+    """로그 파일 하나를 mmap 으로 열어 레코드 배열(읽기 전용 view)과 mmap 을 반환한다.
+
+    헤더가 없거나 다른 형식이면 ValueError. 끝의 잘린 레코드는 빼고 읽는다.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER_SIZE:
+            raise ValueError(f"{path}: missing header")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, record_size = HEADER.unpack_from(mm)
+    if magic != MAGIC or record_size != RECORD_SIZE:
+        mm.close()
+        raise ValueError(f"{path}: not a round log")
+    count = (size - HEADER_SIZE) // RECORD_SIZE # 마지막 레코드가 잘렸으면 버린다
+    return np.frombuffer(mm, dtype=RECORD_DTYPE, count=count, offset=HEADER_SIZE), mm
+
+
+def _odds_lookup(max_total):
+    """table[total, count] == odds_for_count(count, total)."""
+    return odds_table(-(-max(int(max_total), 1) // DECK_SIZE))
+
+
+_RANK = np.frombuffer(CARD_RANK, dtype=np.uint8)
+_IS_RED = np.frombuffer(CARD_IS_RED, dtype=np.uint8).astype(bool)
+
+
+def verify(records):
+    """레코드 배열을 엔진 규칙으로 다시 계산해 (bad_win, bad_odds, bad_pot) 불리언 배열을 반환한다."""
+    bet = records["bet"]
+    cur = records["current"].astype(np.intp)
+    nxt = records["next"].astype(np.intp)
+    if (cur >= DECK_SIZE).any() or (nxt >= DECK_SIZE).any() or (bet >= len(BET_TYPES)).any():
+        bad = (cur >= DECK_SIZE) | (nxt >= DECK_SIZE) | (bet >= len(BET_TYPES))
+        cur, nxt = np.where(bad, 0, cur), np.where(bad, 0, nxt)
+    else:
+        bad = np.zeros(len(records), dtype=bool)
+    cur_rank, next_rank, next_red = _RANK[cur], _RANK[nxt], _IS_RED[nxt]
+    low, same, high = (records[k].astype(np.intp) for k in ("low", "same", "high"))
+    total = low + same + high
+    ace = cur_rank == ACE
+
+    # is_winning_bet
+    hi_win = np.where(ace, next_rank == ACE, next_rank >= cur_rank)
+    lo_win = np.where(ace, next_rank < ACE, next_rank <= cur_rank)
+    win = np.select([bet == HI, bet == LO, bet == RED], [hi_win, lo_win, next_red], ~next_red)
+
+    # odds_from_split / payout_for
+    table = _odds_lookup(total.max() if len(total) else 1)
+    hi_count = np.where(ace, same, high + same)
+    lo_count = np.where(ace, low, low + same)
+    count = np.where(bet == HI, hi_count, lo_count)
+    odds = np.where(bet >= RED, ODDS_FIXED, table[total, np.minimum(count, total)])
+
+    # int(pot * mult), 버스트면 0
+    pot_before = records["pot_before"]
+    pot = np.where(win, np.trunc(pot_before * odds).astype(np.int64), 0)
+
+    bad_win = bad | (win != records["win"].astype(bool))
+    bad_odds = bad | (odds != records["odds"]) | (count > total)
+    bad_pot = bad | (pot != records["pot_after"]) | (pot_before <= 0)
+    return bad_win, bad_odds, bad_pot
+
+
+def replay(paths, session=None, keep=100):
+    """로그 파일들을 검증한다. keep 은 bad_records 에 남길 불일치 레코드 (파일, 번호) 수."""
+    files = log_files(paths)
+    key = session_key(session) if session is not None else None
+    records = bad_win_n = bad_odds_n = bad_pot_n = mismatches = 0
+    bad_records = []
+    start = time.perf_counter()
+    for path in files:
+        data, mm = read_records(path)
+        try:
+            for lo in range(0, len(data), CHUNK_RECORDS):
+                chunk = data[lo:lo + CHUNK_RECORDS]
+                offsets = None
+                if key is not None:
+                    offsets = np.flatnonzero(chunk["session"] == key)
+                    chunk = chunk[offsets]
+                bad_win, bad_odds, bad_pot = verify(chunk)
+                bad = bad_win | bad_odds | bad_pot
+                records += len(chunk)
+                bad_win_n += int(bad_win.sum())
+                bad_odds_n += int(bad_odds.sum())
+                bad_pot_n += int(bad_pot.sum())
+                mismatches += int(bad.sum())
+                for i in np.flatnonzero(bad)[:max(0, keep - len(bad_records))]:
+                    bad_records.append((str(path), lo + int(offsets[i] if offsets is not None else i)))
+                del chunk
+        finally:
+            del data
+            mm.close()
+    return ReplayResult(len(files), records, mismatches, bad_win_n, bad_odds_n, bad_pot_n,
+                        time.perf_counter() - start, bad_records)
+
+
+def format_record(record):
+    cur_r, cur_s, _ = get_card_display(*CARDS[record["current"] % DECK_SIZE])
+    nxt_r, nxt_s, _ = get_card_display(*CARDS[record["next"] % DECK_SIZE])
+    bet = BET_TYPES[record["bet"]] if record["bet"] < len(BET_TYPES) else f"?{record['bet']}"
+    return (f"{bytes(record['session']).hex()} {cur_s}{cur_r} {bet:<5} -> {nxt_s}{nxt_r} "
+            f"split={record['low']}/{record['same']}/{record['high']} x{record['odds']} "
+            f"{record['pot_before']:,} -> {record['pot_after']:,} {'win' if record['win'] else 'bust'}")
+
+
+def format_result(result):
+    rate = result.records / result.seconds if result.seconds > 0 else 0.0
+    lines = [
+        f"files        {result.files:,}",
+        f"records      {result.records:,} in {result.seconds:.3f}s ({rate:,.0f} records/s)",
+        f"mismatches   {result.mismatches:,} (win {result.bad_win:,}, odds {result.bad_odds:,}, pot {result.bad_pot:,})",
+    ]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hi-Lo round log replay / audit")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_DIR], help="로그 파일 또는 디렉터리")
+    parser.add_argument("--session", help="이 플레이어 id 의 레코드만 검증")
+    parser.add_argument("--show", type=int, default=10, help="출력할 불일치 레코드 수")
+    args = parser.parse_args(argv)
+
+    try:
+        result = replay(args.paths, session=args.session, keep=args.show)
+    except (OSError, ValueError) as e:
+        print(f"bad or empty round log: {e}", file=sys.stderr)
+        return 2
+    print(format_result(result))
+    for path, index in result.bad_records:
+        data, mm = read_records(path)
+        print(f"  {path}#{index}: {format_record(data[index])}")
+        del data
+        mm.close()
+    return 1 if result.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
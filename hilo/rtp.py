@@ -0,0 +1,137 @@
+"""베팅 종류별 정확한 RTP / 하우스 엣지 표. 시뮬레이션 없이 도달 가능한 슈 구성을 전부 센다.
+
+한 번의 베팅에서 배당과 승패가 슈 구성의 어느 부분에 의존하는지만 남겨서 열거한다.
+- Hi / Lo: 현재 rank 미만 / 동일 / 초과 장수 (low, same, high). 배당은 simulator.odds_table
+  (= engine.odds_for_count, round(.., 2) 와 ODDS_CAP 포함) 에서 읽는다.
+- Red / Black: 남은 빨강 / 검정 장수. 배당 ODDS_FIXED.
+- 받는 돈은 process_bet 과 같이 int(pot * 배당) 으로 자르므로 RTP 는 pot 에 따라 달라진다.
+
+현재 카드를 뺀 슈에서 남은 장수 m 이 정해지면 구성은 초기하분포를 따른다. 표의 열은
+- fresh: 새 슈 첫 베팅 (m = 전체 - 1, 게임마다 여기서 시작)
+- mean : m = 1 .. 전체 - 1 을 같은 비중으로 둔 평균 (슈를 끝까지 쓸 때 베팅 시점이 고르게 퍼진 경우)
+- min / max: 도달 가능한 구성 중 최저 / 최고 (컷 카드 뒤 새 슈로 바뀐 직후의 가득 찬 슈 포함)
+all 행은 rank (또는 현재 카드 색) 를 같은 확률로 둔 평균이다.
+
+    python -m hilo.rtp --pot 1000 --pot 5000 > rtp.txt
+"""
+import argparse
+from math import comb
+
+import numpy as np
+
+from .cards import ACE, DECK_SIZE, RANKS, RANK_MAP
+from .engine import BET_TYPES, ODDS_CAP, ODDS_FIXED
+from .simulator import odds_table
+
+RANK_LABELS = {rank: RANK_MAP.get(rank, str(rank)) for rank in RANKS}
+COLUMNS = ("fresh", "mean", "edge", "min", "max")
+
+
+def _comb_row(n):
+    return np.array([float(comb(n, k)) for k in range(n + 1)])
+
+
+def _summary(rtp, weight, fresh, reshuffled):
+    """rtp / weight 는 같은 모양의 격자. weight 는 m 별 초기하 확률 / (전체 - 1)."""
+    reachable = weight > 0
+    mean = float((rtp * weight).sum())
+    low, high = float(rtp[reachable].min()), float(rtp[reachable].max())
+    return fresh, mean, 1 - mean, min(low, reshuffled), max(high, reshuffled)
+
+
+def _grid_weight(pools, total):
+    """pools 별 남은 장수 격자의 확률 (m 마다 초기하, m = 1..total-1 평균). 격자 축 순서는 pools 순서."""
+    grids = np.meshgrid(*[np.arange(n + 1) for n in pools], indexing="ij")
+    m = sum(grids)
+    numerator = np.ones(m.shape)
+    for pool, grid in zip(pools, grids):
+        numerator = numerator * _comb_row(pool)[grid]
+    weight = numerator / _comb_row(sum(pools))[m] / (total - 1)
+    weight[(m == 0) | (m == total)] = 0.0
+    return grids, m, weight
+
+
+def _win_counts(rank, low, same, high):
+    """Hi / Lo 가 이기는 장수. Ace 특수 룰: Hi = Same, Lo = Under. 그 외에는 동일(Tie)도 이긴다."""
+    if rank == ACE:
+        return {"Hi": same, "Lo": low}
+    return {"Hi": high + same, "Lo": low + same}
+
+
+def rank_rtp(rank, pot, num_decks=2):
+    """현재 rank 에서 Hi / Lo 한 번의 RTP 요약 {bet: (fresh, mean, edge, min, max)}."""
+    per_rank = 4 * num_decks
+    total = DECK_SIZE * num_decks
+    table = odds_table(num_decks)
+    pools = (per_rank * (rank - 2), per_rank - 1, per_rank * (ACE - rank)) # 현재 카드 한 장은 빠져 있다
+    (low, same, high), m, weight = _grid_weight(pools, total)
+    m_safe = np.maximum(m, 1)
+    full = (pools[0], per_rank, pools[2]) # 컷 카드 뒤 새 슈 (현재 카드는 예전 슈의 카드)
+    full_counts = _win_counts(rank, *full)
+
+    result = {}
+    for bet, count in _win_counts(rank, low, same, high).items():
+        paid = (pot * table[m_safe, count]).astype(np.int64) # int(pot * 배당)
+        rtp = paid * count / m_safe / pot
+        reshuffled = int(pot * table[total, full_counts[bet]]) * full_counts[bet] / total / pot
+        result[bet] = _summary(rtp, weight, float(rtp[pools]), reshuffled)
+    return result
+
+
+def color_rtp(current_red, pot, num_decks=2):
+    """현재 카드 색에서 Red / Black 한 번의 RTP 요약 {bet: (...)}."""
+    half = DECK_SIZE // 2 * num_decks
+    total = DECK_SIZE * num_decks
+    pools = (half - current_red, half - (not current_red))
+    (red, black), m, weight = _grid_weight(pools, total)
+    m_safe = np.maximum(m, 1)
+    paid = int(pot * ODDS_FIXED)
+    result = {}
+    for bet, count, full_count in (("Red", red, half), ("Black", black, half)):
+        rtp = paid * count / m_safe / pot
+        result[bet] = _summary(rtp, weight, float(rtp[pools]), paid * full_count / total / pot)
+    return result
+
+
+def report(pot, num_decks=2):
+    """[(행 이름, bet, (fresh, mean, edge, min, max))] 순서대로."""
+    rows = []
+    by_rank = {rank: rank_rtp(rank, pot, num_decks) for rank in RANKS}
+    for rank in RANKS:
+        for bet in ("Hi", "Lo"):
+            rows.append((RANK_LABELS[rank], bet, by_rank[rank][bet]))
+    by_color = {red: color_rtp(red, pot, num_decks) for red in (True, False)}
+    for red in (True, False):
+        for bet in ("Red", "Black"):
+            rows.append(("red" if red else "black", bet, by_color[red][bet]))
+    # 현재 rank / 색이 고르게 나온다고 보고 평균. min / max 는 전체에서
+    for bet in BET_TYPES:
+        summaries = ([by_rank[rank][bet] for rank in RANKS] if bet in ("Hi", "Lo")
+                     else [by_color[red][bet] for red in (True, False)])
+        fresh = sum(s[0] for s in summaries) / len(summaries)
+        mean = sum(s[1] for s in summaries) / len(summaries)
+        rows.append(("all", bet, (fresh, mean, 1 - mean, min(s[3] for s in summaries),
+                                  max(s[4] for s in summaries))))
+    return rows
+
+
+def format_report(pots, num_decks=2):
+    lines = [f"# hilo exact single-bet RTP  decks={num_decks}  odds_fixed={ODDS_FIXED}  odds_cap={ODDS_CAP}"]
+    for pot in pots:
+        lines.append(f"## pot={pot}")
+        lines.append(f"{'state':<6} {'bet':<6}" + "".join(f" {name:>9}" for name in COLUMNS))
+        for state, bet, values in report(pot, num_decks):
+            lines.append(f"{state:<6} {bet:<6}" + "".join(f" {value:9.4%}" for value in values))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hi-Lo exact RTP / house edge table")
+    parser.add_argument("--pot", type=int, action="append", help="pot before the bet (repeatable, default 1000)")
+    parser.add_argument("--decks", type=int, default=2)
+    args = parser.parse_args(argv)
+    print(format_report(args.pot or [1000], args.decks))
+
+
+if __name__ == "__main__":
+    main()
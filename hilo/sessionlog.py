@@ -0,0 +1,110 @@
+"""세션 전체 라운드 기록. 열마다 NumPy 배열 하나 (카드 코드 uint8, 팟 int64) 에 쌓는다.
+
+라운드마다 파이썬 객체를 만들지 않고 미리 잡아 둔 배열 칸에 값만 쓴다. 배열은 두 배씩 늘리다가 max_bytes 에
+닿으면 더 늘리지 않고 가장 오래된 라운드부터 덮어쓴다 (dropped 로 센다).
+
+summary() 는 append 때 고쳐 두는 누적값(이긴 수, 팟 증감)을 읽고, rows(n) 은 head 기준으로 최근 n 칸만 잘라 읽는다.
+둘 다 쌓인 라운드 수와 무관하다 (rows 는 n 에 비례).
+
+프로세스 안의 기록이다. 영구 감사 기록은 roundlog, 잔액은 ledger.
+"""
+import numpy as np
+
+from .cards import CARDS
+from .engine import BET_TYPES
+
+MAX_BYTES = 1 << 20 # 세션 하나당 상한 (기본 1 MiB, 약 5만 라운드)
+INITIAL_ROWS = 64
+
+COLUMNS = (
+    ("card", np.uint8),       # 베팅 때의 현재 카드 코드
+    ("bet", np.uint8),        # BET_TYPES 인덱스
+    ("next_card", np.uint8),  # 뽑힌 카드 코드
+    ("win", np.bool_),
+    ("pot_before", np.int64),
+    ("pot_after", np.int64),  # 버스트면 0
+)
+ROW_BYTES = sum(np.dtype(dtype).itemsize for _, dtype in COLUMNS)
+
+
+class SessionLog:
+    """engine.session_log 에 붙이면 process_bet 마다 append 가 불린다."""
+
+    __slots__ = ("capacity", "columns", "size", "head", "dropped", "wins", "net")
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.capacity = max_bytes // ROW_BYTES
+        if self.capacity < 1:
+            raise ValueError(f"max_bytes must be at least {ROW_BYTES}")
+        rows = min(INITIAL_ROWS, self.capacity)
+        self.columns = {name: np.zeros(rows, dtype) for name, dtype in COLUMNS}
+        self.size = 0 # 들어 있는 라운드 수
+        self.head = 0 # 가장 오래된 라운드 위치 (가득 찬 뒤에만 움직인다)
+        self.dropped = 0
+        self.wins = 0 # 들어 있는 라운드 중 이긴 수
+        self.net = 0 # 들어 있는 라운드의 팟 증감 합계
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+    def _grow(self):
+        rows = min(len(self.columns["card"]) * 2, self.capacity)
+        for name, column in self.columns.items():
+            grown = np.zeros(rows, column.dtype)
+            grown[:len(column)] = column
+            self.columns[name] = grown
+
+    def append(self, card, bet, next_card, win, pot_before, pot_after):
+        columns = self.columns
+        allocated = len(columns["card"])
+        if self.size < allocated:
+            i = self.size
+            self.size += 1
+        elif allocated < self.capacity:
+            self._grow()
+            i = self.size
+            self.size += 1
+        else: # 상한에 닿았다. 가장 오래된 라운드 자리에 쓴다
+            i = self.head
+            self.head = (i + 1) % allocated
+            self.dropped += 1
+            # 덮어쓸 라운드를 누적값에서 뺀다
+            self.wins -= bool(columns["win"][i])
+            self.net -= int(columns["pot_after"][i]) - int(columns["pot_before"][i])
+        self.wins += bool(win)
+        self.net += pot_after - pot_before
+        columns["card"][i] = card
+        columns["bet"][i] = bet
+        columns["next_card"][i] = next_card
+        columns["win"][i] = win
+        columns["pot_before"][i] = pot_before
+        columns["pot_after"][i] = pot_after
+
+    def column(self, name, last=None):
+        """한 열을 시간 순서로. last 가 있으면 최근 last 라운드만. 배열을 고치지 말고 읽기만 한다.
+
+        최근 라운드가 배열 끝에서 앞으로 넘어가지 않으면 복사 없는 view 다.
+        """
+        data = self.columns[name][:self.size]
+        count = self.size if last is None else max(min(last, self.size), 0)
+        end = self.head or self.size # 가장 최근 라운드 다음 자리
+        if count <= end:
+            return data[end - count:end]
+        return np.concatenate((data[len(data) - (count - end):], data[:end]))
+
+    def summary(self):
+        """(라운드 수, 이긴 수, 팟 증감 합계, 버려진 라운드 수). 누적값을 읽으므로 상수 시간."""
+        return self.size, self.wins, self.net, self.dropped
+
+    def rows(self, last=20):
+        """최근 last 라운드를 dict 목록으로 (새 것이 먼저). 카드는 (rank, suit), bet 은 이름."""
+        columns = {name: self.column(name, last).tolist() for name, _ in COLUMNS}
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        for row in rows:
+            row["card"], row["next_card"] = CARDS[row["card"]], CARDS[row["next_card"]]
+            row["bet"] = BET_TYPES[row["bet"]]
+        return rows[::-1]
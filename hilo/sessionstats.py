@@ -0,0 +1,77 @@
+"""세션 통계. process_bet / add_chip / cash_out 때 누적값만 고쳐서 라운드 수와 무관하게 상수 시간이다.
+
+- 베팅 종류별 라운드 / 승리 수, 최장 연승
+- 게임(칩 → 인출 또는 버스트)마다의 수익 배수 (인출 금액 / 투자 원금, 버스트면 0) 의 평균과 분산 (Welford)
+- 인출한 게임의 평균 배수, 순손익 (인출 합계 - 건 칩 합계)
+"""
+from .engine import BET_TYPES
+
+
+class SessionStats:
+    """engine.session_stats 에 붙이면 엔진이 bet / chip / cash_out 을 부른다."""
+
+    __slots__ = ("rounds_by_bet", "wins_by_bet", "streak", "longest_streak", "staked", "returned",
+                 "games", "mean_return", "m2_return", "cash_outs", "cash_out_mult_sum")
+
+    def __init__(self):
+        self.rounds_by_bet = [0] * len(BET_TYPES)
+        self.wins_by_bet = [0] * len(BET_TYPES)
+        self.streak = 0
+        self.longest_streak = 0
+        self.staked = 0
+        self.returned = 0
+        self.games = 0 # 끝난 게임 수
+        self.mean_return = 0.0
+        self.m2_return = 0.0
+        self.cash_outs = 0
+        self.cash_out_mult_sum = 0.0
+
+    def _finish_game(self, multiple):
+        self.games += 1
+        delta = multiple - self.mean_return
+        self.mean_return += delta / self.games
+        self.m2_return += delta * (multiple - self.mean_return)
+
+    def chip(self, amount):
+        self.staked += amount
+
+    def bet(self, bet_index, win):
+        self.rounds_by_bet[bet_index] += 1
+        if win:
+            self.wins_by_bet[bet_index] += 1
+            self.streak += 1
+            if self.streak > self.longest_streak:
+                self.longest_streak = self.streak
+        else:
+            self.streak = 0
+            self._finish_game(0.0)
+
+    def cash_out(self, amount, invested):
+        self.returned += amount
+        multiple = amount / invested if invested > 0 else 1.0
+        self.cash_outs += 1
+        self.cash_out_mult_sum += multiple
+        self._finish_game(multiple)
+
+    @property
+    def rounds(self):
+        return sum(self.rounds_by_bet)
+
+    @property
+    def net(self):
+        """인출 합계 - 건 칩 합계. 진행 중인 팟은 넣지 않는다."""
+        return self.returned - self.staked
+
+    def win_rates(self):
+        """{bet: 승률 또는 None(베팅한 적 없음)}."""
+        return {bet: wins / rounds if rounds else None
+                for bet, wins, rounds in zip(BET_TYPES, self.wins_by_bet, self.rounds_by_bet)}
+
+    @property
+    def avg_cash_out_multiple(self):
+        return self.cash_out_mult_sum / self.cash_outs if self.cash_outs else 0.0
+
+    @property
+    def return_variance(self):
+        """게임당 수익 배수의 표본 분산."""
+        return self.m2_return / (self.games - 1) if self.games > 1 else 0.0
@@ -0,0 +1,159 @@
+"""남은 카드와 랭크별 장수(히스토그램)를 함께 관리하는 슈."""
+import struct
+
+import numpy as np
+
+from .cards import ACE, CARD_RANK, CARDS, DECK_SIZE, create_deck
+
+MIN_DECKS, MAX_DECKS = 1, 8
+# num_decks(1) + cursor(2) + seed(8) + cut(2) + continuous(1) + draws(4) + penetration(8)
+_HEADER_SIZE = 26
+_V1_HEADER_SIZE = 18 # penetration 을 저장하지 않던 형식 (GameState VERSION 1)
+_PENETRATION = struct.Struct("<d")
+SEED_BITS = 63
+_CSM_BLOCK = 256 # 연속 셔플 때 한 번에 뽑아 두는 난수 개수
+_RANK_TABLE = CARD_RANK + bytes(256 - DECK_SIZE) # bytes.translate 용 코드 -> rank
+# 구성 fingerprint: rank 마다 장수를 RANK_BITS 비트씩 이어 붙인 정수 (8덱이면 rank 당 최대 32장)
+RANK_BITS = 6
+_RANK_UNIT = [0, 0] + [1 << (RANK_BITS * (rank - 2)) for rank in range(2, ACE + 1)]
+
+
+def new_seed(rng=None):
+    """슈 seed 하나 (0 <= seed < 2**63). rng 가 없으면 OS 엔트로피."""
+    if rng is None:
+        rng = np.random.default_rng()
+    return int(rng.integers(1 << SEED_BITS))
+
+
+def composition_fingerprint(counts):
+    """counts[rank] 히스토그램을 정수 하나로. 같은 남은 구성이면 덱 수와 무관하게 같은 값."""
+    return sum(count * _RANK_UNIT[rank] for rank, count in enumerate(counts))
+
+
+def validate_shoe(num_decks, penetration=1.0):
+    if not MIN_DECKS <= num_decks <= MAX_DECKS:
+        raise ValueError(f"num_decks must be {MIN_DECKS}..{MAX_DECKS}, got {num_decks}")
+    if not 0 < penetration <= 1:
+        raise ValueError(f"penetration must be in (0, 1], got {penetration}")
+
+
+class Shoe:
+    """카드 코드 bytearray 와 draw 커서. counts 는 draw 때마다 증분 갱신된다.
+
+    카드 순서는 seed 하나로 정해진다. Shoe(num_decks, seed) 는 언제 만들어도 같은 순서다.
+
+    - penetration: 컷 카드 위치 (전체 대비 비율). 커서가 컷 카드에 닿으면 needs_shuffle.
+    - continuous: 연속 셔플(CSM). 테이블의 카드는 다음 카드를 뽑은 뒤 슈의 무작위 위치로 돌아가므로
+      슈는 항상 (전체 - 현재 카드) 이고 셔플이 필요 없다.
+
+    draw 와 rank_split 은 덱 수와 무관하게 상수 시간이다. fingerprint 는 counts 를 정수 하나로 접은 값으로
+    draw 때 함께 갱신되며, 배당 캐시(engine.odds_for_fingerprint)의 키로 쓰인다.
+    """
+
+    __slots__ = ("num_decks", "penetration", "continuous", "seed", "codes", "cursor", "cut", "counts",
+                 "fingerprint", "draws", "_csm_rng", "_csm_block")
+
+    def __init__(self, num_decks=2, seed=None, penetration=1.0, continuous=False):
+        validate_shoe(num_decks, penetration)
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.continuous = continuous
+        self.shuffle(seed)
+
+    def shuffle(self, seed=None):
+        """seed 로 다시 섞는다. seed 가 없으면 새로 뽑는다."""
+        self.seed = new_seed() if seed is None else seed
+        self.codes = create_deck(self.num_decks, np.random.default_rng(self.seed))
+        self.cursor = 0
+        self.cut = max(2, int(len(self.codes) * self.penetration))
+        # counts[rank] = 남은 장수 (index 0, 1 은 사용하지 않음)
+        self.counts = [0, 0] + [4 * self.num_decks] * (ACE - 1)
+        self.fingerprint = composition_fingerprint(self.counts)
+        self.draws = 0
+        self._csm_rng = None
+
+    def __len__(self):
+        return len(self.codes) - self.cursor
+
+    @property
+    def needs_shuffle(self):
+        return not self.continuous and self.cursor >= self.cut
+
+    def draw_code(self):
+        if self.continuous and self.cursor:
+            return self._draw_continuous()
+        code = self.codes[self.cursor]
+        self.cursor += 1
+        self.draws += 1
+        rank = CARD_RANK[code]
+        self.counts[rank] -= 1
+        self.fingerprint -= _RANK_UNIT[rank]
+        return code
+
+    def _draw_continuous(self):
+        # codes[0] 은 테이블의 카드. 남은 카드 중 하나를 뽑고 그 자리에 테이블 카드를 돌려놓는다.
+        codes = self.codes
+        j = 1 + int(self._uniform() * (len(codes) - 1))
+        code, previous = codes[j], codes[0]
+        codes[0], codes[j] = code, previous
+        self.draws += 1
+        rank, returned = CARD_RANK[code], CARD_RANK[previous]
+        self.counts[rank] -= 1
+        self.counts[returned] += 1
+        self.fingerprint += _RANK_UNIT[returned] - _RANK_UNIT[rank]
+        return code
+
+    def _uniform(self):
+        # seed 에서 갈라진 별도 PCG64 스트림. 블록 단위로 뽑아 두어 draw 마다 numpy 호출을 하지 않는다.
+        n = self.draws - 1 # 연속 셔플 난수는 두 번째 draw 부터 쓴다
+        if self._csm_rng is None or n % _CSM_BLOCK == 0:
+            if self._csm_rng is None:
+                bit_generator = np.random.PCG64([self.seed, 1])
+                bit_generator.advance(n - n % _CSM_BLOCK)
+                self._csm_rng = np.random.Generator(bit_generator)
+            self._csm_block = self._csm_rng.random(_CSM_BLOCK).tolist()
+        return self._csm_block[n % _CSM_BLOCK]
+
+    def draw(self):
+        return CARDS[self.draw_code()]
+
+    def rank_split(self, rank):
+        """(rank 미만, rank 동일, rank 초과) 장수. 덱 크기와 무관하게 13칸 안에서 계산."""
+        counts = self.counts
+        low = sum(counts[:rank])
+        same = counts[rank]
+        return low, same, len(self) - low - same
+
+    def to_bytes(self):
+        return (bytes((self.num_decks,)) + self.cursor.to_bytes(2, "little") + self.seed.to_bytes(8, "little")
+                + self.cut.to_bytes(2, "little") + bytes((self.continuous,)) + self.draws.to_bytes(4, "little")
+                + _PENETRATION.pack(self.penetration) + self.codes)
+
+    @classmethod
+    def from_bytes(cls, data, v1=False):
+        """to_bytes 의 역. v1=True 면 penetration 이 없는 예전 형식으로 읽고 penetration 은 cut 으로 어림한다."""
+        shoe = cls.__new__(cls)
+        shoe.num_decks = data[0]
+        shoe.cursor = int.from_bytes(data[1:3], "little")
+        shoe.seed = int.from_bytes(data[3:11], "little")
+        shoe.cut = int.from_bytes(data[11:13], "little")
+        shoe.continuous = bool(data[13])
+        shoe.draws = int.from_bytes(data[14:_V1_HEADER_SIZE], "little")
+        header_size = _V1_HEADER_SIZE if v1 else _HEADER_SIZE
+        shoe.codes = bytearray(data[header_size:])
+        if (not MIN_DECKS <= shoe.num_decks <= MAX_DECKS or len(shoe.codes) != DECK_SIZE * shoe.num_decks
+                or shoe.cursor > len(shoe.codes) or not 2 <= shoe.cut <= len(shoe.codes)
+                or max(shoe.codes) >= DECK_SIZE):
+            raise ValueError("corrupt shoe data")
+        if v1:
+            shoe.penetration = shoe.cut / len(shoe.codes)
+        else:
+            (shoe.penetration,) = _PENETRATION.unpack_from(data, _V1_HEADER_SIZE)
+            # 저장한 penetration 으로 다시 계산한 컷 카드가 저장한 cut 과 같아야 한다
+            if not 0 < shoe.penetration <= 1 or shoe.cut != max(2, int(len(shoe.codes) * shoe.penetration)):
+                raise ValueError("corrupt shoe data")
+        ranks = shoe.codes[shoe.cursor:].translate(_RANK_TABLE)
+        shoe.counts = [0, 0] + [ranks.count(rank) for rank in range(2, ACE + 1)]
+        shoe.fingerprint = composition_fingerprint(shoe.counts)
+        shoe._csm_rng = None
+        return shoe
@@ -0,0 +1,124 @@
+"""미리 섞어 둔 슈를 쌓아 두는 풀. 재시작 / 슈 소진 때 셔플을 요청 경로에서 빼낸다.
+
+백그라운드 스레드가 풀을 capacity 까지 채워 두고, 세션은 take() 로 하나씩 가져간다 (deque popleft, 상수 시간).
+남은 개수가 low_water 아래로 내려가면 바로 채우기 시작한다. 풀이 비어 있으면 그 자리에서 만들고 miss 로 센다.
+
+풀에서 나온 슈도 각자 seed 를 가지므로 Shoe(num_decks, shoe.seed) 로 재현된다. seed 는 풀의 Generator 에서 뽑는다.
+
+열려 있는 풀은 모듈이 기억해 두고, pool_stats() 가 풀마다 PoolStats 를 돌려준다 (계측 내보내기 / 관리 패널용).
+"""
+import threading
+import time
+import weakref
+from collections import deque, namedtuple
+
+import numpy as np
+
+from .shoe import Shoe, new_seed, validate_shoe
+
+CAPACITY = 64
+
+PoolStats = namedtuple("PoolStats", ["num_decks", "penetration", "continuous", "depth", "capacity", "taken",
+                                     "misses", "produced", "refill_rate", "uptime"])
+
+_POOLS = weakref.WeakSet() # 닫히지 않은 풀
+_POOLS_LOCK = threading.Lock()
+
+
+def pool_stats():
+    """열려 있는 풀마다 PoolStats (슈 설정 순)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS)
+    return sorted((pool.stats() for pool in pools), key=lambda stats: stats[:3])
+
+
+class ShoePool:
+    """슈 설정(덱 수, 컷 카드, 연속 셔플) 하나에 풀 하나. 여러 세션이 같이 take() 해도 된다."""
+
+    def __init__(self, num_decks=2, capacity=CAPACITY, low_water=None, seed=None, penetration=1.0,
+                 continuous=False):
+        validate_shoe(num_decks, penetration)
+        self.num_decks = num_decks
+        self.penetration = penetration
+        self.continuous = continuous
+        self.capacity = capacity
+        self.low_water = capacity // 2 if low_water is None else low_water
+        self._rng = np.random.default_rng(seed)
+        self._rng_lock = threading.Lock()
+        self._shoes = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._count_lock = threading.Lock() # taken / misses / produced / _busy
+        self.taken = 0
+        self.misses = 0
+        self.produced = 0
+        self._busy = 0.0 # 채우는 데 쓴 시간 (초)
+        self._started = time.monotonic()
+        self._worker = threading.Thread(target=self._fill_loop, name=f"hilo-shoepool-{num_decks}", daemon=True)
+        self._worker.start()
+        self._wake.set()
+        with _POOLS_LOCK:
+            _POOLS.add(self)
+
+    def _make(self):
+        with self._rng_lock:
+            seed = new_seed(self._rng)
+        return Shoe(self.num_decks, seed, self.penetration, self.continuous)
+
+    @property
+    def spec(self):
+        return self.num_decks, self.penetration, self.continuous
+
+    def take(self):
+        """섞인 새 슈 하나."""
+        try:
+            shoe = self._shoes.popleft()
+            missed = False
+        except IndexError:
+            shoe = self._make()
+            missed = True
+        with self._count_lock:
+            self.taken += 1
+            self.misses += missed
+        if len(self._shoes) < self.low_water:
+            self._wake.set()
+        return shoe
+
+    def _fill_loop(self):
+        while True:
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            start = time.perf_counter()
+            produced = 0
+            while len(self._shoes) < self.capacity and not self._stop.is_set():
+                self._shoes.append(self._make())
+                produced += 1
+            busy = time.perf_counter() - start
+            with self._count_lock:
+                self.produced += produced
+                self._busy += busy
+
+    def wait_full(self, timeout=None):
+        """풀이 capacity 까지 찰 때까지 기다린다 (테스트 / 벤치용). 찼으면 True."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while len(self._shoes) < self.capacity:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def stats(self):
+        """풀 깊이와 채우기 속도(채우는 동안 초당 만든 슈 수)."""
+        with self._count_lock:
+            taken, misses, produced, busy = self.taken, self.misses, self.produced, self._busy
+        return PoolStats(self.num_decks, self.penetration, self.continuous, len(self._shoes), self.capacity, taken,
+                         misses, produced, produced / busy if busy > 0 else 0.0, time.monotonic() - self._started)
+
+    def close(self):
+        with _POOLS_LOCK:
+            _POOLS.discard(self)
+        self._stop.set()
+        self._wake.set()
+        self._worker.join()
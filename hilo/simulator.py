@@ -0,0 +1,216 @@
+"""NumPy 기반 Hi-Lo 배치 시뮬레이터.
+
+한 행이 한 게임(새 슈에서 시작), 한 열이 한 장의 draw 다. 규칙은 엔진과 동일하다.
+- 배당은 engine.odds_for_count 로 미리 만든 (남은 장수, 이길 장수) 테이블에서 읽는다.
+- 팟 갱신은 process_bet 과 같이 int(pot * 배당) 으로 자른다.
+- 슈를 다 쓰도록 살아 있는 게임은 마지막 카드에서 인출한 것으로 본다.
+
+    python -m hilo.simulator --games 1000000 --bet Likely --cash-out-at 3
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .cards import ACE, CARD_IS_RED, CARD_RANK, DECK_CODES, DECK_SIZE
+from .engine import BET_TYPES, ODDS_FIXED, odds_for_count
+from .strategy import LIKELY, STRATEGY_BETS, Strategy, validate_strategy
+
+HI, LO, RED, BLACK = range(len(BET_TYPES))
+
+# 팟 분포 히스토그램 경계 (칩 대비 배수)
+POT_BINS = np.array([0.0, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 20.0, 50.0, 100.0, np.inf])
+
+SimulationResult = namedtuple("SimulationResult", [
+    "games", "rounds", "staked", "returned", "rtp", "bust_rate", "round_bust_rate",
+    "mean_multiplier", "std_multiplier", "pot_histogram", "wins_by_bet", "rounds_by_bet",
+])
+
+_CARD_RANK = np.frombuffer(CARD_RANK, dtype=np.uint8)
+_CARD_IS_RED = np.frombuffer(CARD_IS_RED, dtype=np.uint8).astype(bool)
+_DECK_CODES = np.frombuffer(DECK_CODES, dtype=np.uint8)
+_ODDS_TABLES = {}
+
+
+def odds_table(num_decks):
+    """table[total, count] == odds_for_count(count, total). 엔진은 빈 슈에서 베팅하지 않으므로 total=0 행은 쓰지 않는다."""
+    table = _ODDS_TABLES.get(num_decks)
+    if table is None:
+        size = DECK_SIZE * num_decks + 1
+        table = np.ones((size, size))
+        for total in range(1, size):
+            for count in range(total + 1):
+                table[total, count] = odds_for_count(count, total)
+        _ODDS_TABLES[num_decks] = table
+    return table
+
+
+def _choose_bets(bet, odds_1, odds_2):
+    if bet == LIKELY:
+        hi = (odds_1 > 0) & ((odds_2 == 0) | (odds_1 <= odds_2))
+        return np.where(hi, HI, LO)
+    return np.full(odds_1.shape, BET_TYPES.index(bet))
+
+
+def _draw(rng, shoes, idx, step):
+    """살아 있는 행(idx)만 Fisher-Yates 한 단계: step 위치에 남은 카드 중 하나를 뽑아 놓는다."""
+    pick = rng.integers(step, shoes.shape[1], size=len(idx))
+    drawn = shoes[idx, pick]
+    shoes[idx, pick] = shoes[idx, step]
+    shoes[idx, step] = drawn
+    return drawn
+
+
+def _simulate_batch(strategy, rng, games, num_decks, table):
+    shoes = np.tile(_DECK_CODES, (games, num_decks))
+    shoe_size = shoes.shape[1]
+    chip = strategy.chip
+    target = None if strategy.cash_out_at is None else chip * strategy.cash_out_at
+    last_step = shoe_size - 1
+    if strategy.max_bets is not None:
+        last_step = min(last_step, strategy.max_bets)
+
+    final_pot = np.zeros(games, dtype=np.int64)
+    wins_by_bet = np.zeros(len(BET_TYPES), dtype=np.int64)
+    rounds_by_bet = np.zeros(len(BET_TYPES), dtype=np.int64)
+
+    # 살아 있는 게임만 압축해서 들고 간다
+    idx = np.arange(games)
+    cur = _CARD_RANK[_draw(rng, shoes, idx, 0)].astype(np.intp)
+    counts = np.full((games, ACE + 1), 4 * num_decks, dtype=np.int16)
+    counts[:, :2] = 0
+    counts[idx, cur] -= 1
+    pot = np.full(games, chip, dtype=np.int64)
+    remaining = shoe_size - 1
+
+    for step in range(1, last_step + 1):
+        rows = np.arange(len(idx))
+        low = counts.cumsum(axis=1)[rows, cur - 1]
+        same = counts[rows, cur]
+        high = remaining - low - same
+        ace = cur == ACE
+        odds_1 = table[remaining, np.where(ace, same, high + same)]
+        odds_2 = table[remaining, np.where(ace, low, low + same)]
+
+        bets = _choose_bets(strategy.bet, odds_1, odds_2)
+        mult = np.choose(bets, (odds_1, odds_2, ODDS_FIXED, ODDS_FIXED))
+
+        drawn = _draw(rng, shoes, idx, step)
+        nxt = _CARD_RANK[drawn].astype(np.intp)
+        nred = _CARD_IS_RED[drawn]
+        win = np.choose(bets, (
+            np.where(ace, nxt == ACE, nxt >= cur),
+            np.where(ace, nxt < ACE, nxt <= cur),
+            nred,
+            ~nred,
+        ))
+        rounds_by_bet += np.bincount(bets, minlength=len(BET_TYPES))
+        wins_by_bet += np.bincount(bets[win], minlength=len(BET_TYPES))
+
+        pot = (pot * mult).astype(np.int64)
+        if step == last_step:
+            cashed = win
+        elif target is not None:
+            cashed = win & (pot >= target)
+        else:
+            cashed = np.zeros_like(win)
+        final_pot[idx[cashed]] = pot[cashed] # 버스트한 게임은 0 유지
+        keep = win & ~cashed
+        if not keep.any():
+            break
+
+        counts[rows, nxt] -= 1
+        idx, cur, pot, counts = idx[keep], nxt[keep], pot[keep], counts[keep]
+        remaining -= 1
+
+    return final_pot, wins_by_bet, rounds_by_bet
+
+
+def simulate(strategy, games, num_decks=2, seed=None, batch_size=200_000):
+    """games 개의 독립 게임을 시뮬레이션. 각 게임은 새 슈에서 chip 하나로 시작한다."""
+    validate_strategy(strategy)
+    rng = np.random.default_rng(seed)
+    table = odds_table(num_decks)
+
+    returned = 0
+    sum_mult = 0.0
+    sum_mult_sq = 0.0
+    busts = 0
+    hist = np.zeros(len(POT_BINS) - 1, dtype=np.int64)
+    wins_by_bet = np.zeros(len(BET_TYPES), dtype=np.int64)
+    rounds_by_bet = np.zeros(len(BET_TYPES), dtype=np.int64)
+
+    done = 0
+    while done < games:
+        n = min(batch_size, games - done)
+        final_pot, wins, rounds = _simulate_batch(strategy, rng, n, num_decks, table)
+        mult = final_pot / strategy.chip
+        returned += int(final_pot.sum())
+        sum_mult += float(mult.sum())
+        sum_mult_sq += float((mult * mult).sum())
+        busts += int((final_pot == 0).sum())
+        hist += np.histogram(mult, bins=POT_BINS)[0]
+        wins_by_bet += wins
+        rounds_by_bet += rounds
+        done += n
+
+    staked = strategy.chip * games
+    rounds = int(rounds_by_bet.sum())
+    mean_mult = sum_mult / games
+    return SimulationResult(
+        games=games,
+        rounds=rounds,
+        staked=staked,
+        returned=returned,
+        rtp=returned / staked,
+        bust_rate=busts / games,
+        round_bust_rate=busts / rounds if rounds else 0.0,
+        mean_multiplier=mean_mult,
+        std_multiplier=max(sum_mult_sq / games - mean_mult * mean_mult, 0.0) ** 0.5,
+        pot_histogram=dict(zip(_bin_labels(), hist.tolist())),
+        wins_by_bet=dict(zip(BET_TYPES, wins_by_bet.tolist())),
+        rounds_by_bet=dict(zip(BET_TYPES, rounds_by_bet.tolist())),
+    )
+
+
+def _bin_labels():
+    edges = POT_BINS.tolist()
+    return [f"[{lo:g}, {hi:g})" for lo, hi in zip(edges[:-1], edges[1:])]
+
+
+def format_result(result):
+    lines = [
+        f"games        {result.games:,}",
+        f"rounds       {result.rounds:,}",
+        f"RTP          {result.rtp:.4%}",
+        f"bust rate    {result.bust_rate:.4%} (per game), {result.round_bust_rate:.4%} (per round)",
+        f"multiplier   mean {result.mean_multiplier:.4f}, std {result.std_multiplier:.4f}",
+        "pot distribution (x chip):",
+    ]
+    for label, count in result.pot_histogram.items():
+        lines.append(f"  {label:<14} {count / result.games:8.4%}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hi-Lo Monte Carlo simulator")
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--bet", choices=STRATEGY_BETS, default=LIKELY)
+    parser.add_argument("--cash-out-at", type=float, default=2.0)
+    parser.add_argument("--max-bets", type=int, default=None)
+    parser.add_argument("--chip", type=int, default=1000)
+    parser.add_argument("--decks", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    strategy = Strategy(args.bet, args.cash_out_at, args.max_bets, args.chip)
+    start = time.perf_counter()
+    result = simulate(strategy, args.games, num_decks=args.decks, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(format_result(result))
+    print(f"elapsed      {elapsed:.2f}s ({result.rounds / elapsed:,.0f} rounds/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""현재 카드, 팟, 남은 슈 구성에서 각 행동(Hi/Lo/Red/Black/인출)의 정확한 기대값.
+
+슈 구성은 (rank, 색) 26칸 장수 튜플로 표현한다. 색이 같은 무늬는 규칙상 구별되지 않는다.
+배당은 engine.odds_from_split, 승패는 engine.is_winning_bet, 팟은 int(pot * 배당) 으로
+process_bet 과 같게 계산한다. horizon 은 앞으로 더 둘 수 있는 베팅 수의 상한이며,
+그 안에서의 최적 정책 기대값은 근사 없이 정확하다.
+
+슈 교체도 엔진(draw_card)과 같다.
+- 컷 카드: 뽑은 카드가 컷 카드 위치에 닿으면 다음 베팅은 가득 찬 새 슈에서 한다 (penetration=1 이면 마지막 카드).
+- 연속 셔플(continuous): 테이블 카드가 슈로 돌아가므로 슈는 항상 (전체 - 현재 카드) 다.
+
+    python -m hilo.solver --games 200 --horizon 2
+"""
+import argparse
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from .cards import BLACK_SUITS, CARD_IS_RED, CARD_RANK, DECK_SIZE, RANKS, RED_SUITS, shuffle_decks
+from .engine import BET_TYPES, is_winning_bet, odds_from_split, payout_for
+from .shoe import validate_shoe
+
+CASH_OUT = "CashOut"
+ACTIONS = BET_TYPES + (CASH_OUT,)
+CACHE_SIZE = 200_000
+COMPOSITION_SIZE = len(RANKS) * 2
+
+# 구성 인덱스 -> (rank, 대표 무늬)
+_SLOTS = tuple((r, RED_SUITS[0] if red else BLACK_SUITS[0]) for r in RANKS for red in (0, 1))
+
+# values: 행동별 기대 인출 금액, best: 기대값이 가장 큰 행동 (동률이면 인출 우선)
+# edge: 가장 좋은 베팅의 기대값 / pot - 1 (양수면 플레이어 우위)
+Solution = namedtuple("Solution", ["values", "best", "edge"])
+
+
+def slot_of(rank, is_red):
+    return (rank - 2) * 2 + is_red
+
+
+def full_composition(num_decks=2):
+    return (2 * num_decks,) * COMPOSITION_SIZE
+
+
+def shoe_composition(shoe):
+    comp = [0] * COMPOSITION_SIZE
+    for code in shoe.codes[shoe.cursor:]:
+        comp[slot_of(CARD_RANK[code], CARD_IS_RED[code])] += 1
+    return tuple(comp)
+
+
+def shoe_cut(num_decks, penetration):
+    """새 슈의 컷 카드 위치 (Shoe.cut 과 같다)."""
+    return max(2, int(DECK_SIZE * num_decks * penetration))
+
+
+def _odds(rank, comp):
+    i = slot_of(rank, 0)
+    low = sum(comp[:i])
+    same = comp[i] + comp[i + 1]
+    return odds_from_split(rank, low, same, sum(comp) - low - same)
+
+
+def _next_shoe(comp, i, until_cut, cut, continuous, num_decks):
+    """i 칸의 카드를 뽑은 뒤 다음 베팅의 (구성, 컷 카드까지 남은 draw 수)."""
+    if continuous: # 뽑은 카드가 테이블에 남고 예전 테이블 카드는 슈로 돌아간다
+        full = full_composition(num_decks)
+        return full[:i] + (full[i] - 1,) + full[i + 1:], 0
+    if until_cut == 1: # 컷 카드. 엔진은 바로 새 슈로 바꾼다
+        return full_composition(num_decks), cut
+    return comp[:i] + (comp[i] - 1,) + comp[i + 1:], until_cut - 1
+
+
+def _bet_values(rank, comp, pot, horizon, num_decks, until_cut, cut, continuous):
+    total = sum(comp)
+    odds = _odds(rank, comp)
+
+    values = []
+    for bet in BET_TYPES:
+        new_pot = int(pot * payout_for(bet, odds))
+        ev = 0
+        for i, count in enumerate(comp):
+            if not count: continue
+            next_rank, next_suit = _SLOTS[i]
+            if not is_winning_bet(bet, rank, next_rank, next_suit): continue
+            if horizon == 1:
+                ev += count * new_pot
+            else:
+                next_comp, next_until_cut = _next_shoe(comp, i, until_cut, cut, continuous, num_decks)
+                ev += count * _value(next_rank, next_comp, new_pot, horizon - 1, num_decks, next_until_cut, cut,
+                                     continuous)
+        values.append(ev / total)
+    return values
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _value(rank, comp, pot, horizon, num_decks, until_cut, cut, continuous):
+    """최대 horizon 번 더 베팅할 수 있을 때 최적 정책의 기대 인출 금액."""
+    if horizon == 0 or pot <= 0:
+        return pot
+    return max(pot, *_bet_values(rank, comp, pot, horizon, num_decks, until_cut, cut, continuous))
+
+
+def solve(current_rank, pot, composition, horizon=3, num_decks=2, penetration=1.0, continuous=False,
+          until_cut=None):
+    """각 행동의 기대값과 최적 행동. 베팅 행동의 값은 그 베팅 뒤 최적으로 진행했을 때의 값이다.
+
+    composition 은 현재 카드를 뺀 남은 슈, until_cut 은 컷 카드까지 남은 draw 수 (Shoe.cut - Shoe.cursor).
+    until_cut 이 없으면 composition 의 장수와 penetration 으로 정한다. 새 슈는 num_decks / penetration 으로 만든다.
+    """
+    if len(composition) != COMPOSITION_SIZE:
+        raise ValueError(f"composition must have {COMPOSITION_SIZE} slots")
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1")
+    validate_shoe(num_decks, penetration)
+    composition = tuple(composition)
+    cut = shoe_cut(num_decks, penetration)
+    if continuous:
+        until_cut = 0
+    elif until_cut is None:
+        until_cut = cut - (DECK_SIZE * num_decks - sum(composition))
+    if not continuous and until_cut < 1:
+        raise ValueError("composition is past the cut card")
+    if not sum(composition):
+        raise ValueError("composition is empty")
+    bet_values = _bet_values(current_rank, composition, pot, horizon, num_decks, until_cut, cut, continuous)
+    values = dict(zip(BET_TYPES, bet_values))
+    values[CASH_OUT] = pot
+    best = max(ACTIONS[::-1], key=values.__getitem__)
+    edge = max(bet_values) / pot - 1 if pot > 0 else 0.0
+    return Solution(values, best, edge)
+
+
+def solve_engine(engine, horizon=3):
+    """HiLoEngine 의 현재 상태 기준으로 solve. 지금 슈의 컷 카드 위치와 엔진의 슈 설정을 따른다."""
+    deck = engine.deck
+    return solve(engine.current_card[0], engine.current_pot, shoe_composition(deck), horizon=horizon,
+                 num_decks=engine.num_decks, penetration=engine.penetration, continuous=engine.continuous,
+                 until_cut=deck.cut - deck.cursor)
+
+
+def cache_info():
+    return _value.cache_info()
+
+
+def clear_cache():
+    _value.cache_clear()
+
+
+def audit(games, pot=1_000_000, horizon=1, num_decks=2, seed=None):
+    """무작위 슈를 끝까지 넘기며 각 시점을 풀어 edge > 0 인 상태를 모은다.
+
+    (draw 순번, 현재 rank, 최적 행동, edge) 목록과 검사한 상태 수를 반환.
+    """
+    shoes = shuffle_decks(num_decks, games, np.random.default_rng(seed))
+    found = []
+    states = 0
+    for codes in shoes.tolist():
+        comp = list(full_composition(num_decks))
+        for position, code in enumerate(codes[:-1]):
+            rank = CARD_RANK[code]
+            comp[slot_of(rank, CARD_IS_RED[code])] -= 1
+            solution = solve(rank, pot, comp, horizon=horizon, num_decks=num_decks)
+            states += 1
+            if solution.edge > 0:
+                found.append((position, rank, solution.best, solution.edge))
+    return found, states
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hi-Lo exact EV audit")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--pot", type=int, default=1_000_000)
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument("--decks", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    found, states = audit(args.games, pot=args.pot, horizon=args.horizon, num_decks=args.decks, seed=args.seed)
+    print(f"states checked     {states:,}")
+    print(f"positive edge      {len(found):,} ({len(found) / states:.4%})")
+    for position, rank, best, edge in sorted(found, key=lambda f: -f[3])[:10]:
+        print(f"  draw {position:>3}  rank {rank:>2}  {best:<7} edge {edge:+.4%}")
+    print(f"cache              {cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""한 플레이어의 게임 상태. __slots__ 로 세션당 메모리를 줄이고, 바이트 직렬화와 불변식 검사를 한 곳에 모은다.
+
+HiLoEngine 이 이 클래스를 상속해 규칙(add_chip, process_bet, ...)을 얹는다.
+
+바이트 형식 (little-endian, VERSION 2)
+    header  : version B | flags B (1=bust, 2=continuous) | num_decks B | current B | history_len B | 1x |
+              balance q | current_pot q | total_invested q | seed Q | penetration d | bust_at d
+    history : history_len 개 카드 코드 (최근 것부터)
+    rng     : PCG64 state 16s | inc 16s | has_uint32 B | uinteger I
+    message : 길이 H + UTF-8
+    deck    : 나머지 전부 (Shoe.to_bytes)
+
+VERSION 1 은 deck 에 penetration 이 없는 형식이다. 읽을 수는 있고, 저장은 항상 VERSION 2 로 한다.
+"""
+import struct
+from collections import deque
+
+import numpy as np
+
+from .cards import CARDS, card_code
+from .shoe import Shoe, composition_fingerprint, validate_shoe
+
+HISTORY_SIZE = 6
+VERSION = 2
+
+_HEADER = struct.Struct("<BBBBBxqqqQdd")
+_RNG = struct.Struct("<16s16sBI")
+_MESSAGE_LEN = struct.Struct("<H")
+_BUST, _CONTINUOUS = 1, 2
+_CARD_SET = frozenset(CARDS)
+
+
+def _rng_to_bytes(rng):
+    state = rng.bit_generator.state
+    return _RNG.pack(state["state"]["state"].to_bytes(16, "little"), state["state"]["inc"].to_bytes(16, "little"),
+                     state["has_uint32"], state["uinteger"])
+
+
+def _rng_from_bytes(data, offset):
+    rng_state, inc, has_uint32, uinteger = _RNG.unpack_from(data, offset)
+    bit_generator = np.random.PCG64(0) # 상태는 바로 덮어쓰므로 OS 엔트로피를 쓰지 않는다
+    bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": int.from_bytes(rng_state, "little"), "inc": int.from_bytes(inc, "little")},
+        "has_uint32": has_uint32,
+        "uinteger": uinteger,
+    }
+    return np.random.Generator(bit_generator)
+
+
+class GameState:
+    """잔액 / 팟 / 슈 / 현재 카드 / 히스토리 / 버스트 여부와 화면 메시지."""
+
+    __slots__ = ("balance", "current_pot", "total_invested", "bust_state", "bust_at", "deck", "current_card",
+                 "history", "num_decks", "penetration", "continuous", "seed", "rng", "message")
+
+    def check(self):
+        """불변식 검사. 깨졌으면 ValueError."""
+        problems = []
+        if self.balance < 0: problems.append(f"balance {self.balance} < 0")
+        if self.current_pot < 0: problems.append(f"current_pot {self.current_pot} < 0")
+        if self.total_invested < 0: problems.append(f"total_invested {self.total_invested} < 0")
+        # 배당은 1.0 이상이라 버스트 전까지 팟은 원금 아래로 내려가지 않는다
+        if not self.bust_state and self.current_pot < self.total_invested:
+            problems.append(f"current_pot {self.current_pot} < total_invested {self.total_invested}")
+        if len(self.history) > HISTORY_SIZE: problems.append(f"history has {len(self.history)} cards")
+        if self.current_card not in _CARD_SET: problems.append(f"bad current_card {self.current_card!r}")
+        if not _CARD_SET.issuperset(self.history): problems.append("bad card in history")
+        try:
+            validate_shoe(self.num_decks, self.penetration)
+        except ValueError as e:
+            problems.append(str(e))
+        deck = self.deck
+        if sum(deck.counts) != len(deck): problems.append("deck counts do not match remaining cards")
+        if deck.fingerprint != composition_fingerprint(deck.counts): problems.append("deck fingerprint is stale")
+        if deck.needs_shuffle: problems.append("deck is past the cut card")
+        if problems:
+            raise ValueError("invalid game state: " + "; ".join(problems))
+
+    def to_bytes(self):
+        flags = (_BUST if self.bust_state else 0) | (_CONTINUOUS if self.continuous else 0)
+        message = self.message.encode("utf-8")
+        return b"".join((
+            _HEADER.pack(VERSION, flags, self.num_decks, card_code(*self.current_card), len(self.history),
+                         self.balance, self.current_pot, self.total_invested, self.seed, self.penetration,
+                         self.bust_at),
+            bytes(card_code(*card) for card in self.history),
+            _rng_to_bytes(self.rng),
+            _MESSAGE_LEN.pack(len(message)), message,
+            self.deck.to_bytes(),
+        ))
+
+    def load_bytes(self, data):
+        """to_bytes 로 저장한 상태를 이 객체에 덮어쓴다. 검사를 통과하지 못하면 아무것도 바꾸지 않는다."""
+        state = GameState.from_bytes(data)
+        for name in GameState.__slots__:
+            setattr(self, name, getattr(state, name))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """to_bytes 의 역. 읽은 뒤 check() 를 통과해야 반환한다."""
+        try:
+            (version, flags, num_decks, current, history_len, balance, current_pot, total_invested, seed,
+             penetration, bust_at) = _HEADER.unpack_from(data)
+            if version not in (1, VERSION):
+                raise ValueError(f"unsupported game state version {version}")
+            if history_len > HISTORY_SIZE:
+                raise ValueError(f"history has {history_len} cards")
+            offset = _HEADER.size
+            history = deque((CARDS[code] for code in data[offset:offset + history_len]), maxlen=HISTORY_SIZE)
+            offset += history_len
+            rng = _rng_from_bytes(data, offset)
+            offset += _RNG.size
+            (message_len,) = _MESSAGE_LEN.unpack_from(data, offset)
+            offset += _MESSAGE_LEN.size
+            message = bytes(data[offset:offset + message_len]).decode("utf-8")
+            deck = Shoe.from_bytes(data[offset + message_len:], v1=version == 1)
+            current_card = CARDS[current]
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise ValueError(f"corrupt game state: {e}") from None
+
+        state = cls.__new__(cls)
+        state.balance, state.current_pot, state.total_invested = balance, current_pot, total_invested
+        state.bust_state, state.bust_at = bool(flags & _BUST), bust_at
+        state.deck, state.current_card, state.history = deck, current_card, history
+        state.num_decks, state.penetration, state.continuous = num_decks, penetration, bool(flags & _CONTINUOUS)
+        state.seed, state.rng, state.message = seed, rng, message
+        state.check()
+        return state
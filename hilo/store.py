@@ -0,0 +1,247 @@
+"""프로세스 밖에 둘 수 있는 게임 상태 저장소.
+
+플레이어 한 명의 GameState 바이트를 (version, data) 로 저장한다. save 는 읽었을 때의 version 과 지금 version 이
+같을 때만 성공하고(낙관적 잠금) 아니면 StateConflict. 같은 플레이어의 요청이 두 워커(또는 두 탭)에서 동시에 와도
+먼저 저장한 쪽만 반영되므로 add_chip 이 두 번 빠지거나 cash_out 이 두 번 지급되지 않는다.
+
+- MemoryStore: 프로세스 안 dict. 지금까지와 같이 한 프로세스로 돌릴 때.
+- SQLiteStore: 로컬 SQLite 파일 (WAL). 같은 머신의 여러 streamlit 프로세스가 한 플레이어를 나눠 처리할 때.
+
+open_store("memory") / open_store("sqlite:hilo_state.db") 로 고르고, 앱은 HILO_STATE_STORE 환경변수를 쓴다.
+"""
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from .engine import HiLoEngine
+
+Snapshot = namedtuple("Snapshot", ["version", "data"])
+
+
+class StateConflict(Exception):
+    """다른 요청이 먼저 저장해서 version 이 맞지 않는다."""
+
+
+class MemoryStore:
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def load(self, key):
+        """Snapshot 또는 None."""
+        return self._states.get(key)
+
+    def version(self, key):
+        snapshot = self._states.get(key)
+        return 0 if snapshot is None else snapshot.version
+
+    def save(self, key, data, version):
+        """읽었을 때 version 이 그대로일 때만 저장하고 새 version 을 반환한다. 새 키는 version=0."""
+        with self._lock:
+            current = self.version(key)
+            if current != version:
+                raise StateConflict(f"{key}: expected version {version}, found {current}")
+            self._states[key] = Snapshot(version + 1, bytes(data))
+            return version + 1
+
+    def delete(self, key):
+        with self._lock:
+            self._states.pop(key, None)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS game_states (
+    player TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteStore:
+    """프로세스마다 하나씩 연다. version 검사와 쓰기가 UPDATE ... WHERE version = ? 한 문장이라
+    프로세스 사이에 따로 잠글 필요가 없다."""
+
+    def __init__(self, path="hilo_state.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock() # 연결 하나를 스레드들이 나눠 쓴다
+
+    def load(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT version, data FROM game_states WHERE player = ?", (key,)).fetchone()
+        return None if row is None else Snapshot(*row)
+
+    def version(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM game_states WHERE player = ?", (key,)).fetchone()
+        return 0 if row is None else row[0]
+
+    def save(self, key, data, version):
+        with self._lock:
+            if version == 0:
+                try:
+                    self._conn.execute("INSERT INTO game_states (player, version, data, updated) VALUES (?, 1, ?, ?)",
+                                       (key, data, time.time()))
+                except sqlite3.IntegrityError:
+                    raise StateConflict(f"{key}: already exists") from None
+                return 1
+            cursor = self._conn.execute(
+                "UPDATE game_states SET version = version + 1, data = ?, updated = ? WHERE player = ? AND version = ?",
+                (data, time.time(), key, version))
+        if cursor.rowcount != 1:
+            raise StateConflict(f"{key}: expected version {version}, found {self.version(key)}")
+        return version + 1
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM game_states WHERE player = ?", (key,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_store(url="memory"):
+    """'memory' 또는 'sqlite:<경로>'."""
+    if url == "memory":
+        return MemoryStore()
+    if url.startswith("sqlite:"):
+        return SQLiteStore(url[len("sqlite:"):] or "hilo_state.db")
+    raise ValueError(f"unknown state store: {url!r}")
+
+
+# 트랜잭션 동안 _Deferred 로 바꿔 끼우는 엔진 속성
+_RECORDERS = ("ledger", "round_log", "session_log", "session_stats")
+
+
+class _Deferred:
+    """트랜잭션 동안 원장 / 라운드 로그 / 세션 기록 / 통계 호출을 모아 두었다가 저장에 성공하면 넘긴다.
+
+    어떤 메서드를 불러도 (이름, 인자) 로 쌓기만 한다.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.calls.append((name, args))
+        return call
+
+    def commit(self):
+        for name, args in self.calls:
+            getattr(self.target, name)(*args)
+
+
+class GameSession:
+    """store 에 있는 플레이어 한 명과 그 로컬 사본(engine).
+
+    engine 객체는 바뀌지 않고, 다른 워커가 저장한 새 version 이 보이면 그 자리에서 다시 읽는다(sync).
+    상태를 바꾸는 코드는 transaction() 안에서 실행한다. 원장 / 라운드 로그 / 세션 기록 / 통계는 저장에 성공한 뒤에 넘어간다.
+
+        with session.transaction() as game:
+            game.add_chip(1000)
+    """
+
+    def __init__(self, store, player_id, new_engine, ledger=None, round_log=None, shoe_pool_for=None,
+                 session_log=None, session_stats=None):
+        """new_engine() 은 store 에 아직 없는 플레이어의 첫 엔진을 만든다.
+
+        shoe_pool_for(num_decks, penetration, continuous) 는 읽어 온 슈 설정에 맞는 ShoePool (없으면 None).
+        """
+        self.store = store
+        self.player_id = player_id
+        self.shoe_pool_for = shoe_pool_for
+        self.conflicts = 0
+        snapshot = store.load(player_id)
+        if snapshot is None:
+            self.engine = new_engine()
+            data = self.engine.to_bytes()
+            try:
+                self._saved(store.save(player_id, data, 0), data)
+                return
+            except StateConflict:
+                snapshot = store.load(player_id)
+        else:
+            self.engine = HiLoEngine.from_bytes(snapshot.data, ledger=ledger, player_id=player_id,
+                                                round_log=round_log, session_log=session_log,
+                                                session_stats=session_stats)
+        self._load(snapshot)
+
+    def _saved(self, version, data):
+        self.version, self.data = version, data
+
+    def _load(self, snapshot):
+        engine = self.engine
+        engine.load_bytes(snapshot.data)
+        pool = self.shoe_pool_for(engine.num_decks, engine.penetration, engine.continuous) if self.shoe_pool_for else None
+        engine.configure_shoe(engine.num_decks, engine.penetration, engine.continuous, pool)
+        self._saved(snapshot.version, bytes(snapshot.data))
+
+    def sync(self):
+        """store 의 version 이 다르면 다시 읽는다. 다시 읽었으면 True."""
+        if self.store.version(self.player_id) == self.version:
+            return False
+        self._load(self.store.load(self.player_id))
+        return True
+
+    def transaction(self):
+        return _Transaction(self)
+
+    def action(self, fn):
+        """fn 을 transaction 안에서 실행하는 콜백. 충돌하면 이번 클릭은 버리고 먼저 저장된 상태를 보여준다."""
+        def run(*args, **kwargs):
+            try:
+                with self.transaction():
+                    return fn(*args, **kwargs)
+            except StateConflict:
+                return None
+        return run
+
+
+class _Transaction:
+    def __init__(self, session):
+        self.session = session
+
+    def __enter__(self):
+        session = self.session
+        session.sync()
+        engine = session.engine
+        self.recorders = [getattr(engine, name) for name in _RECORDERS]
+        for name, recorder in zip(_RECORDERS, self.recorders):
+            setattr(engine, name, _Deferred(recorder) if recorder is not None else None)
+        return engine
+
+    def __exit__(self, exc_type, exc, tb):
+        session = self.session
+        engine = session.engine
+        deferred = [getattr(engine, name) for name in _RECORDERS]
+        for name, recorder in zip(_RECORDERS, self.recorders):
+            setattr(engine, name, recorder)
+        # st.rerun() 같은 스크립트 제어 예외(BaseException)는 정상 종료로 보고 저장한다
+        if exc_type is not None and issubclass(exc_type, Exception):
+            session._load(session.store.load(session.player_id))
+            return False
+        data = engine.to_bytes()
+        if data != session.data:
+            try:
+                session._saved(session.store.save(session.player_id, data, session.version), data)
+            except StateConflict:
+                # 다른 요청이 먼저 저장했다. 이번 변경은 버리고 그쪽 상태를 읽어 온다.
+                session.conflicts += 1
+                session._load(session.store.load(session.player_id))
+                if exc_type is None:
+                    raise
+                return False
+        for recorder in deferred:
+            if recorder is not None:
+                recorder.commit()
+        return False
@@ -0,0 +1,37 @@
+"""베팅 전략 정의. 시뮬레이터와 엔진 기반 도구가 같은 전략을 해석한다."""
+from collections import namedtuple
+
+from .engine import BET_TYPES
+
+LIKELY = "Likely" # Hi / Lo 중 확률이 높은(배당이 낮은) 쪽
+STRATEGY_BETS = BET_TYPES + (LIKELY,)
+
+# bet: 매 라운드 베팅 종류 (STRATEGY_BETS 중 하나)
+# cash_out_at: 팟이 chip 의 몇 배 이상이 되면 인출할지 (None 이면 배수 조건 없음)
+# max_bets: 한 게임에서 이긴 베팅이 이 횟수에 도달하면 인출 (None 이면 제한 없음)
+# chip: 게임 시작 시 거는 칩 금액
+Strategy = namedtuple("Strategy", ["bet", "cash_out_at", "max_bets", "chip"], defaults=(2.0, None, 1000))
+
+
+def validate_strategy(strategy):
+    if strategy.bet not in STRATEGY_BETS:
+        raise ValueError(f"unknown strategy bet: {strategy.bet!r}")
+    if strategy.cash_out_at is None and strategy.max_bets is None:
+        raise ValueError("strategy needs cash_out_at or max_bets")
+    if strategy.chip <= 0:
+        raise ValueError("chip must be positive")
+    return strategy
+
+
+def choose_bet(bet, odds_1, odds_2):
+    """전략의 bet 을 이번 라운드의 실제 베팅 종류로. odds_1 / odds_2 는 calculate_odds 의 (Hi, Lo) 배당."""
+    if bet != LIKELY:
+        return bet
+    # 배당이 낮은 쪽이 확률이 높은 쪽. 0 은 이길 카드가 없다는 뜻
+    return "Hi" if odds_1 > 0 and (odds_2 == 0 or odds_1 <= odds_2) else "Lo"
+
+
+def should_cash_out(strategy, pot, wins):
+    """이긴 직후 인출할지. 팟이 chip * cash_out_at 이상이거나 이번 게임에서 이긴 횟수가 max_bets 에 닿으면."""
+    return ((strategy.cash_out_at is not None and pot >= strategy.chip * strategy.cash_out_at)
+            or (strategy.max_bets is not None and wins >= strategy.max_bets))
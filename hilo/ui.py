@@ -0,0 +1,196 @@
+"""세 화면(app.py / ap1.py / mapp.py)이 같이 쓰는 Streamlit 배선.
+
+- 프로세스당 하나인 자원(계측, 원장, 라운드 로그, 슈 풀, 상태 저장소)은 st.cache_resource 로 만든다.
+- start_session() 은 브라우저 세션마다 플레이어 하나(GameSession)를 만들고 매 rerun 마다 저장소와 맞춘다.
+- settings_sidebar() 는 사이드바의 게임 설정 / 계측 패널, auto_play_sidebar() 는 자동 플레이 폼과 결과다.
+- session_sidebar() 는 세션 통계 / 기록 패널이다. SESSION_FRAGMENT 로 다시 그리므로 칩 / 베팅 / 인출 뒤 함께 rerun 한다.
+
+화면 배치와 메시지 문구는 각 화면이 정한다.
+"""
+import os
+import uuid
+
+import streamlit as st
+
+from .autoplay import MAX_ROUNDS, auto_play
+from .cards import get_card_display
+from .engine import HiLoEngine, odds_cache_info
+from .ledger import Ledger
+from .metrics import METRICS
+from .roundlog import RoundLog
+from .sessionlog import SessionLog
+from .sessionstats import SessionStats
+from .shoe import MAX_DECKS, MIN_DECKS
+from .shoepool import ShoePool, pool_stats
+from .store import GameSession, open_store
+from .strategy import STRATEGY_BETS, Strategy
+
+START_BALANCE = 1000000
+START_DECKS = 2
+START_MESSAGE = "게임을 시작합니다. 칩을 눌러 베팅하세요."
+SESSION_FRAGMENT = "session" # 사이드바의 세션 패널 fragment
+
+
+# HILO_METRICS=<파일> 이면 엔진 호출 / 화면 구역별 지연 히스토그램을 모아 Prometheus 텍스트로 쓴다 (프로세스당 한 번).
+# 꺼져 있으면 lap() 은 빈 함수다.
+@st.cache_resource
+def get_metrics():
+    path = os.environ.get("HILO_METRICS")
+    if path:
+        METRICS.enable(path)
+    return METRICS
+
+
+# 잔액 / 팟은 서버 재시작이나 재접속에도 남도록 SQLite 원장에 기록한다 (프로세스당 하나).
+@st.cache_resource
+def get_ledger():
+    return Ledger()
+
+
+# 베팅마다 감사용 바이너리 레코드를 남긴다. 검증: python -m hilo.roundlog
+@st.cache_resource
+def get_round_log():
+    return RoundLog()
+
+
+# 재시작 / 슈 소진 때 셔플하지 않도록 미리 섞인 슈를 백그라운드에서 채워 둔다 (슈 설정마다 하나).
+@st.cache_resource
+def get_shoe_pool(num_decks, penetration=1.0, continuous=False):
+    return ShoePool(num_decks, penetration=penetration, continuous=continuous)
+
+
+# 게임 상태는 HILO_STATE_STORE 저장소(memory / sqlite:<경로>)에 version 과 함께 둔다.
+# sqlite 를 쓰면 여러 streamlit 프로세스가 같은 플레이어를 이어서 처리할 수 있다.
+@st.cache_resource
+def get_state_store():
+    return open_store(os.environ.get("HILO_STATE_STORE", "memory"))
+
+
+def new_game(player_id, session_log, session_stats):
+    game = HiLoEngine.restore(get_ledger(), player_id, balance=START_BALANCE, num_decks=START_DECKS,
+                              round_log=get_round_log(), shoe_pool=get_shoe_pool(START_DECKS),
+                              session_log=session_log, session_stats=session_stats)
+    game.message = START_MESSAGE
+    return game
+
+
+def start_session():
+    """(game_session, game). 첫 rerun 에 URL 의 ?player= 로 플레이어를 정하고, 저장소 / 원장에 기록이 있으면 이어서
+    시작한다. 이후 rerun 은 다른 워커가 저장한 상태가 있으면 다시 읽는다.
+    """
+    if "game_session" not in st.session_state:
+        player_id = st.query_params.get("player")
+        if not player_id:
+            player_id = uuid.uuid4().hex
+            st.query_params["player"] = player_id
+        session_log = SessionLog() # 이 브라우저 세션의 전체 라운드 (메모리 상한 있음)
+        session_stats = SessionStats() # 이 브라우저 세션의 누적 통계
+        st.session_state.game_session = GameSession(get_state_store(), player_id,
+                                                    lambda: new_game(player_id, session_log, session_stats),
+                                                    ledger=get_ledger(), round_log=get_round_log(),
+                                                    shoe_pool_for=get_shoe_pool, session_log=session_log,
+                                                    session_stats=session_stats)
+        st.session_state.game = st.session_state.game_session.engine
+    game_session = st.session_state.game_session
+    game_session.sync()
+    return game_session, st.session_state.game
+
+
+def settings_sidebar(game_session, game):
+    """초기 머니 / 슈 설정과 초기화 버튼. ?admin=1 이고 계측이 켜져 있으면 구역별 지연 통계, 배당 캐시, 슈 풀 상태
+    (전체 rerun 때 갱신).
+    """
+    metrics = get_metrics()
+    with st.sidebar:
+        st.header("게임 설정")
+        initial_balance = st.number_input("초기 보유 머니", min_value=10000, value=START_BALANCE, step=10000)
+        # 슈 설정은 초기화 때 적용된다
+        num_decks = st.select_slider("덱 수 (Decks)", options=list(range(MIN_DECKS, MAX_DECKS + 1)),
+                                     value=game.num_decks)
+        continuous = st.checkbox("연속 셔플 (CSM)", value=game.continuous)
+        penetration = st.slider("컷 카드 위치 (Penetration)", min_value=0.5, max_value=1.0, value=game.penetration,
+                                step=0.05, disabled=continuous)
+        if metrics.enabled and st.query_params.get("admin"):
+            st.header("계측 (ms)")
+            st.dataframe([section._asdict() for section in metrics.stats()], hide_index=True)
+            cache = odds_cache_info()
+            lookups = cache.hits + cache.misses
+            st.caption(f"배당 캐시: 적중 {cache.hits / lookups if lookups else 0:.1%} "
+                       f"({cache.hits:,} / {lookups:,}), {cache.currsize:,} / {cache.maxsize:,} 항목")
+            st.caption("슈 풀")
+            st.dataframe([{"덱": pool.num_decks, "컷": "CSM" if pool.continuous else f"{pool.penetration:.0%}",
+                           "깊이": f"{pool.depth} / {pool.capacity}", "사용": pool.taken, "miss": pool.misses,
+                           "채움/s": round(pool.refill_rate)} for pool in pool_stats()], hide_index=True)
+            if st.button("계측 초기화"):
+                metrics.reset()
+        if st.button("설정된 머니로 완전 초기화"):
+            with game_session.transaction():
+                game.configure_shoe(num_decks, penetration, continuous,
+                                    get_shoe_pool(num_decks, penetration, continuous))
+                game.reset_balance(initial_balance)
+                game.message = f"초기화 되었습니다. ({num_decks} Decks)"
+                st.rerun()
+
+
+def card_text(card):
+    rank, suit, _ = get_card_display(*card)
+    return f"{suit}{rank}"
+
+
+def auto_play_sidebar(game_session, game):
+    """자동 플레이: 전략 하나로 여러 라운드를 이번 rerun 한 번에 엔진에서 돌리고, 합계와 최근 라운드만 보여준다."""
+    @game_session.action
+    def run_auto_play():
+        strategy = Strategy(st.session_state.auto_bet, st.session_state.auto_cash_out_at or None,
+                            st.session_state.auto_max_bets or None, st.session_state.auto_chip)
+        try:
+            result = auto_play(game, strategy, st.session_state.auto_rounds)
+        except ValueError as e:
+            game.message = f"자동 플레이 설정 오류: {e}"
+            return
+        st.session_state.auto_result = result
+        game.message = f"자동 플레이 {result.rounds}라운드 · 순손익 {result.net:+,}원"
+
+    with st.sidebar, st.expander("자동 플레이 (Auto-play)"):
+        with st.form("auto_play"):
+            st.selectbox("베팅", STRATEGY_BETS, key="auto_bet")
+            st.number_input("인출 배수 (0 = 사용 안 함)", min_value=0.0, value=2.0, step=0.5, key="auto_cash_out_at")
+            st.number_input("게임당 최대 승리 수 (0 = 제한 없음)", min_value=0, value=0, key="auto_max_bets")
+            st.number_input("칩", min_value=1000, value=1000, step=1000, key="auto_chip")
+            st.number_input("라운드 수", min_value=1, max_value=MAX_ROUNDS, value=100, key="auto_rounds")
+            st.form_submit_button("실행", on_click=run_auto_play)
+        result = st.session_state.get("auto_result")
+        if result is not None:
+            st.markdown(f"**{result.rounds}라운드 / {result.games}게임** · 인출 {result.cash_outs} · "
+                        f"버스트 {result.busts}  \n"
+                        f"베팅 ₩ {result.staked:,} · 회수 ₩ {result.returned:,} · 순손익 **{result.net:+,}**")
+            if result.stopped == "balance":
+                st.caption("잔액이 칩보다 적어 멈췄습니다.")
+            st.dataframe([{"게임": r.game, "베팅": r.bet, "카드": f"{card_text(r.card)}→{card_text(r.next_card)}",
+                           "배당": r.odds, "결과": "W" if r.win else "B", "팟": r.pot} for r in result.trace],
+                         hide_index=True)
+
+
+def session_sidebar(game):
+    """사이드바의 세션 패널. 화면의 칩 / 베팅 / 인출 콜백이 st.rerun 대상에 SESSION_FRAGMENT 를 넣어야 갱신된다."""
+    @st.fragment(key=SESSION_FRAGMENT)
+    def session_panels():
+        # 누적값만 읽으므로 라운드 수와 무관하게 상수 시간
+        with st.expander("세션 통계"):
+            stats = game.session_stats
+            st.markdown(f"**{stats.rounds:,}라운드** · 최장 연승 {stats.longest_streak} · 순손익 **{stats.net:+,}**  \n"
+                        f"인출 {stats.cash_outs:,}회, 평균 x{stats.avg_cash_out_multiple:.2f} · "
+                        f"게임당 수익 배수 평균 {stats.mean_return:.3f}, 분산 {stats.return_variance:.3f}")
+            st.caption(" · ".join(f"{bet} {rate:.1%}" if rate is not None else f"{bet} -"
+                                  for bet, rate in stats.win_rates().items()))
+        with st.expander("세션 기록"):
+            log = game.session_log
+            rounds, wins, net, dropped = log.summary()
+            st.caption(f"{rounds:,}라운드 · 승 {wins:,} · 팟 증감 {net:+,} · {log.nbytes / 1024:.0f} KiB"
+                       + (f" · 오래된 {dropped:,}라운드는 버림" if dropped else ""))
+            st.dataframe([{"베팅": row["bet"], "카드": f"{card_text(row['card'])}→{card_text(row['next_card'])}",
+                           "결과": "W" if row["win"] else "B", "팟": row["pot_after"]} for row in log.rows()],
+                         hide_index=True)
+
+    with st.sidebar:
+        session_panels()
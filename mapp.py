@@ -1,314 +1,158 @@
+import os
 import streamlit as st
-import random
 
-# --- 1. 페이지 및 스타일 설정 ---
-st.set_page_config(page_title="Hi-Lo Mobile Optimized", layout="centered")
-
-# 모바일 최적화 CSS (가로 스크롤 방지 및 레퍼런스 UI 반영)
-st.markdown("""
-<style>
-    /* 전체 앱 여백 및 스크롤 제거 */
-    .block-container {
-        padding: 0.5rem 0.2rem !important;
-        max-width: 100vw !important;
-        overflow-x: hidden !important;
-    }
-    .stApp { background-color: #161616; color: white; }
-
-    /* 컬럼 가로 배치 강제 및 간격 축소 */
-    div[data-testid="stHorizontalBlock"] {
-        display: flex !important;
-        flex-direction: row !important;
-        flex-wrap: nowrap !important;
-        gap: 4px !important;
-        width: 100% !important;
-    }
-    [data-testid="column"] {
-        min-width: 0px !important;
-        flex: 1 1 auto !important;
-    }
-
-    /* 카드 박스 레이아웃 */
-    .card-box {
-        border-radius: 8px; padding: 12px;
-        text-align: center; font-weight: bold;
-        height: 120px; display: flex; flex-direction: column; 
-        justify-content: center; align-items: center;
-        box-shadow: 0 4px 10px rgba(0,0,0,0.5);
-    }
-    .deck-box { background: #2d3663; border: 1px solid #465298; color: white; }
-    .current-box { background: white; color: black; border: 1px solid #ddd; }
-    .big-card-text { font-size: 3rem; line-height: 1; }
-    
-    /* 히스토리 카드 스타일 */
-    .history-card {
-        border-radius: 4px; padding: 2px;
-        text-align: center; font-size: 11px; font-weight: bold;
-        width: 100%; height: 40px;
-        display: flex; justify-content: center; align-items: center;
-    }
-
-    /* 모든 버튼 공통 스타일 */
-    .stButton > button {
-        background-color: #0047AB !important;
-        color: #FFD700 !important;
-        border: 1px solid #FFD700 !important;
-        border-radius: 6px !important;
-        font-weight: bold !important;
-        width: 100% !important;
-        padding: 4px !important;
-        font-size: 0.85rem !important;
-        transition: transform 0.1s;
-    }
-    .stButton > button:active { transform: scale(0.95); }
-
-    /* 베팅 버튼 전용 */
-    .bet-btn-style > button {
-        height: 70px !important;
-        line-height: 1.3 !important;
-        white-space: pre-wrap !important;
-    }
-
-    /* 칩 버튼 전용 (가로 6개 최적화) */
-    .chip-btn-style > button {
-        height: 38px !important;
-        font-size: 0.7rem !important;
-        background-color: #333 !important;
-        border: 1px solid #555 !important;
-        color: white !important;
-    }
-
-    /* 인출 버튼 (강조) */
-    .cashout-btn-style > button {
-        background-color: #000080 !important;
-        height: 55px !important;
-        font-size: 1.1rem !important;
-        margin: 10px 0;
-    }
-    
-    /* 보유 머니 및 정보 섹션 */
-    .info-msg { text-align: center; color: #ffd700; font-size: 0.9rem; margin: 8px 0; font-weight: bold; }
-    .balance-box {
-        background-color:#222; padding:12px; border-radius:12px;
-        text-align:center; border: 1px solid #444; margin-top: 10px;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# --- 2. 게임 데이터 및 함수 정의 ---
-
-SUITS = ['♠', '♣', '♥', '♦']
-RED_SUITS = ['♥', '♦']
-BLACK_SUITS = ['♠', '♣']
-RANKS = list(range(2, 15)) # 2~14 (Ace=14)
-RANK_MAP = {11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
-
-def get_card_display(rank, suit):
-    r_str = RANK_MAP.get(rank, str(rank))
-    color = "red" if suit in RED_SUITS else "black"
-    return r_str, suit, color
-
-def create_deck(num_decks=2):
-    deck = []
-    for _ in range(num_decks):
-        for r in RANKS:
-            for s in SUITS:
-                deck.append((r, s))
-    random.shuffle(deck)
-    return deck
-
-def reset_game_state():
-    """게임을 재시작 (덱, 현재 카드 리셋). 보유머니는 유지."""
-    st.session_state.deck = create_deck(2)
-    st.session_state.current_card = st.session_state.deck.pop()
-    st.session_state.history = []
-    st.session_state.current_pot = 0 
-
-# 세션 상태 초기화
-if 'deck' not in st.session_state:
-    st.session_state.balance = 1000000
-    st.session_state.current_pot = 0 
-    reset_game_state()
-    st.session_state.game_message = "게임을 시작합니다. 칩을 눌러 베팅하세요."
-
-# 사이드바 설정
-with st.sidebar:
-    st.header("게임 설정")
-    initial_balance = st.number_input("초기 보유 머니", min_value=10000, value=1000000, step=10000)
-    if st.button("설정된 머니로 완전 초기화"):
-        st.session_state.balance = initial_balance
-        reset_game_state()
-        st.session_state.game_message = "초기화 되었습니다."
-        st.rerun()
-
-def draw_card():
-    if len(st.session_state.deck) == 0:
-        st.session_state.deck = create_deck(2)
-        st.session_state.game_message = "덱 셔플 완료 (2 Decks)"
-    return st.session_state.deck.pop()
+from hilo import ODDS_FIXED, card_code, card_html_table, get_card_display, ui
 
-def calculate_odds(current_rank):
-    remaining = st.session_state.deck
-    total = len(remaining)
-    if total == 0: return 1.0, 1.0
+CONTROLS_FRAGMENT = "controls" # 메시지만 바뀔 때 다시 그릴 fragment
+CHIP_FRAGMENTS = [CONTROLS_FRAGMENT, ui.SESSION_FRAGMENT] # 칩 클릭 후 다시 그릴 fragment (통계의 건 칩 합계)
+TABLE_FRAGMENTS = ["table", "controls", ui.SESSION_FRAGMENT] # 베팅 / 인출 후 다시 그릴 fragment
 
-    high_count = len([c for c in remaining if c[0] > current_rank])
-    low_count = len([c for c in remaining if c[0] < current_rank])
-    same_count = len([c for c in remaining if c[0] == current_rank])
+# 테이블(히스토리 + 메인 카드) 렌더링. html: HTML 한 덩어리로 delta 1개, columns: 예전 st.columns 배치
+TABLE_RENDER = os.environ.get("HILO_TABLE_RENDER", "html")
 
-    if current_rank == 14: # Ace 특수 룰
-        prob_1 = same_count / total if total > 0 else 0
-        prob_2 = low_count / total if total > 0 else 0
-    else: # 일반 룰 (Tie 포함)
-        prob_1 = (high_count + same_count) / total if total > 0 else 0
-        prob_2 = (low_count + same_count) / total if total > 0 else 0
+# --- 1. 페이지 및 스타일 설정 ---
+# CSS 는 static/ 에서 정적 파일로 서빙되고 브라우저가 캐시한다. 매 rerun 에는 @import 한 줄만 보낸다.
+CSS_LINK = "<style>@import url('app/static/hilo_mobile.css');</style>"
+st.set_page_config(page_title="Hi-Lo Mobile Optimized", layout="centered")
 
-    odds_1 = round(1 / prob_1, 2) if prob_1 > 0 else 0.0
-    odds_2 = round(1 / prob_2, 2) if prob_2 > 0 else 0.0
-    
-    return min(odds_1, 50.0), min(odds_2, 50.0)
+metrics = ui.get_metrics()
+lap = metrics.laps()
 
+# 모바일 최적화 CSS (가로 스크롤 방지 및 레퍼런스 UI 반영)
+st.html(CSS_LINK)
+lap("css")
+
+# 카드 HTML 조각은 카드 코드별로 미리 만들어 두고 매 rerun 에는 조회만 한다.
+CURRENT_HISTORY_HTML = card_html_table("<div class='history-card' style='background:white; color:{color}; border: 2px solid gold;'>{suit}{rank}</div>")
+HISTORY_HTML = card_html_table("<div class='history-card' style='background:#ddd; color:{color};'>{suit}{rank}</div>")
+MAIN_CARD_HTML = card_html_table("<div class='card-box current-box'><div class='big-card-text'>{suit}{rank}</div></div>")
+DECK_HTML = "<div class='card-box deck-box'><span style='font-size:1.2rem;'>Deck</span><br>{} left</div>"
+TABLE_HTML = ("<div class='history-label'>Previous Cards</div><div class='history-row'>{current}{history}</div>"
+              "<div class='main-row'>{deck}{main}</div>")
+BALANCE_HTML = "<div class='balance-box'><span style='color:#aaa; font-size:0.8rem;'>보유 머니 (Balance)</span><br><span style='font-size:1.8rem; color:#4CAF50; font-weight:bold;'>₩ {:,}</span></div>"
+
+# --- 2. 게임 상태 및 함수 정의 ---
+
+# 플레이어 세션(?player=)과 원장 / 라운드 로그 / 슈 풀 / 상태 저장소 배선, 사이드바 패널은 hilo.ui 를 같이 쓴다.
+game_session, game = ui.start_session()
+ui.settings_sidebar(game_session, game)
+ui.auto_play_sidebar(game_session, game)
+ui.session_sidebar(game)
+
+@game_session.action
 def add_chip(amount):
-    if st.session_state.balance >= amount:
-        st.session_state.balance -= amount
-        st.session_state.current_pot += amount
-        st.session_state.game_message = "베팅 진행 중..."
+    if game.add_chip(amount):
+        game.message = "베팅 진행 중..."
     else:
-        st.session_state.game_message = "잔액이 부족합니다."
+        game.message = "잔액이 부족합니다."
+    st.rerun(CHIP_FRAGMENTS)
 
+@game_session.action
 def cash_out():
-    if st.session_state.current_pot > 0:
-        win_amount = st.session_state.current_pot
-        st.session_state.balance += win_amount
-        st.session_state.game_message = f"이기셨습니다. (+{win_amount:,}원)"
-        reset_game_state()
-    else:
-        st.session_state.game_message = "인출할 금액이 없습니다."
+    win = game.cash_out()
+    if win > 0:
+        game.message = f"성공! {win:,}원 인출 완료"
+        st.rerun(TABLE_FRAGMENTS)
 
+@game_session.action
 def process_bet(bet_type):
-    if st.session_state.current_pot <= 0:
-        st.session_state.game_message = "칩을 먼저 선택해 주세요."
-        return
-
-    current_card = st.session_state.current_card
-    current_rank = current_card[0]
-    
-    odds_1, odds_2 = calculate_odds(current_rank)
-    odds_fixed = 1.95
-
-    next_card = draw_card()
-    next_rank = next_card[0]
-    next_suit = next_card[1]
-    
-    win = False
-    payout_mult = 0.0
-
-    if current_rank == 14: # Ace
-        if bet_type == "Hi": # Same
-            payout_mult = odds_1
-            if next_rank == 14: win = True
-        elif bet_type == "Lo": # Under
-            payout_mult = odds_2
-            if next_rank < 14: win = True
-    else: # Normal
-        if bet_type == "Hi": # Over
-            payout_mult = odds_1
-            if next_rank >= current_rank: win = True
-        elif bet_type == "Lo": # Under
-            payout_mult = odds_2
-            if next_rank <= current_rank: win = True
-
-    if bet_type == "Red":
-        payout_mult = odds_fixed
-        if next_suit in RED_SUITS: win = True
-    elif bet_type == "Black":
-        payout_mult = odds_fixed
-        if next_suit in BLACK_SUITS: win = True
+    if game.current_pot <= 0:
+        game.message = "칩을 먼저 선택해 주세요."
+        st.rerun(CONTROLS_FRAGMENT)
 
-    cur_r_disp, cur_s_disp, _ = get_card_display(next_rank, next_suit)
-    card_disp = f"{cur_s_disp}{cur_r_disp}"
+    result = game.process_bet(bet_type)
 
-    if win:
-        new_pot = int(st.session_state.current_pot * payout_mult)
-        st.session_state.current_pot = new_pot
-        st.session_state.game_message = f"현재 인출가능 금액: {new_pot:,}원"
-        
-        st.session_state.history.insert(0, current_card)
-        if len(st.session_state.history) > 6:
-            st.session_state.history.pop()
-        st.session_state.current_card = next_card
+    if result.win:
+        game.message = f"현재 인출가능 금액: {result.pot:,}원"
     else:
-        st.session_state.game_message = f"버스트 ({card_disp})"
-        reset_game_state()
+        cur_r_disp, cur_s_disp, _ = get_card_display(*result.next_card)
+        game.message = f"버스트 ({cur_s_disp}{cur_r_disp})"
+        game.reset_game_state()
+    if result.shuffled:
+        game.message += f" · 덱 셔플 완료 ({game.num_decks} Decks)"
+    st.rerun(TABLE_FRAGMENTS)
 
 
 # --- 3. UI 구성 ---
+# 버튼은 on_click 콜백으로 처리하고, 바뀐 fragment 만 다시 그린다.
+# - 칩 클릭: controls (메시지, 베팅 버튼, 인출, 칩, 보유 머니) + 사이드바의 세션 패널
+# - 베팅 / 인출: table (히스토리, 메인 카드) + controls + 사이드바의 세션 패널
 st.markdown("<h2 style='text-align:center; color:#ffd700; margin:0;'>HI-LO</h2>", unsafe_allow_html=True)
 
-# 히스토리 (7칸)
-st.caption("Previous Cards")
-h_cols = st.columns(7)
-cur_r, cur_s, cur_c = get_card_display(st.session_state.current_card[0], st.session_state.current_card[1])
-with h_cols[0]:
-    st.markdown(f"<div class='history-card' style='background:white; color:{cur_c}; border: 2px solid gold;'>{cur_s}{cur_r}</div>", unsafe_allow_html=True)
-for i, card in enumerate(st.session_state.history[:6]):
-    hr, hs, hc = get_card_display(card[0], card[1])
-    with h_cols[i+1]:
-        st.markdown(f"<div class='history-card' style='background:#ddd; color:{hc};'>{hs}{hr}</div>", unsafe_allow_html=True)
-
-# 메인 카드 섹션
-st.write("")
-c1, c2 = st.columns(2)
-with c1:
-    st.markdown(f"<div class='card-box deck-box'><span style='font-size:1.2rem;'>Deck</span><br>{len(st.session_state.deck)} left</div>", unsafe_allow_html=True)
-with c2:
-    st.markdown(f"<div class='card-box current-box'><div class='big-card-text'>{cur_s}{cur_r}</div></div>", unsafe_allow_html=True)
-
-st.markdown(f"<div class='info-msg'>{st.session_state.game_message}</div>", unsafe_allow_html=True)
-
-# 베팅 컨트롤
-o1, o2 = calculate_odds(st.session_state.current_card[0])
-label_1 = "Over (Same)" if st.session_state.current_card[0] < 14 else "Same (A)"
-b_col1, b_col2 = st.columns(2)
-with b_col1:
-    st.markdown('<div class="bet-btn-style">', unsafe_allow_html=True)
-    if st.button(f"{label_1}\nx{o1}\nGet: {int(st.session_state.current_pot*o1):,}", key="hi"): process_bet("Hi"); st.rerun()
-    if st.button(f"Black (♠♣)\nx1.95\nGet: {int(st.session_state.current_pot*1.95):,}", key="bl"): process_bet("Black"); st.rerun()
-    st.markdown('</div>', unsafe_allow_html=True)
-with b_col2:
-    st.markdown('<div class="bet-btn-style">', unsafe_allow_html=True)
-    if st.button(f"Under\nx{o2}\nGet: {int(st.session_state.current_pot*o2):,}", key="lo"): process_bet("Lo"); st.rerun()
-    if st.button(f"Red (♥♦)\nx1.95\nGet: {int(st.session_state.current_pot*1.95):,}", key="re"): process_bet("Red"); st.rerun()
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# 인출 버튼
-st.markdown('<div class="cashout-btn-style">', unsafe_allow_html=True)
-if st.button(f"₩ {st.session_state.current_pot:,} IN CHUL (인출)"):
-    if st.session_state.current_pot > 0:
-        win = st.session_state.current_pot
-        st.session_state.balance += win
-        st.session_state.game_message = f"성공! {win:,}원 인출 완료"
-        reset_game_state()
-        st.rerun()
-st.markdown('</div>', unsafe_allow_html=True)
+# 히스토리 / 메인 카드 영역 전체를 카드 코드별로 미리 만든 조각을 이어 붙여 만든다.
+def table_html():
+    cur_code = card_code(*game.current_card)
+    return TABLE_HTML.format(current=CURRENT_HISTORY_HTML[cur_code],
+                             history="".join([HISTORY_HTML[card_code(*card)] for card in game.history]),
+                             deck=DECK_HTML.format(len(game.deck)), main=MAIN_CARD_HTML[cur_code])
+
+@st.fragment(key="table")
+def table():
+    lap = metrics.laps()
+    if TABLE_RENDER == "html":
+        st.html(table_html())
+        lap("table_html")
+        return
 
-# 칩 섹션
-st.markdown("<p style='text-align:center; font-size:0.75rem; margin:0;'>칩을 눌러 베팅금 추가</p>", unsafe_allow_html=True)
-chip_cols = st.columns(6)
-for i, amt in enumerate([1000, 5000, 10000, 50000, 100000, 500000]):
-    with chip_cols[i]:
-        st.markdown('<div class="chip-btn-style">', unsafe_allow_html=True)
-        if st.button(f"+{amt//1000}k", key=f"c_{amt}"):
-            if st.session_state.balance >= amt:
-                st.session_state.balance -= amt
-                st.session_state.current_pot += amt
-                st.rerun()
+    # 히스토리 (7칸)
+    st.caption("Previous Cards")
+    h_cols = st.columns(7)
+    cur_code = card_code(*game.current_card)
+    with h_cols[0]:
+        st.markdown(CURRENT_HISTORY_HTML[cur_code], unsafe_allow_html=True)
+    for i, card in enumerate(game.history):
+        with h_cols[i+1]:
+            st.markdown(HISTORY_HTML[card_code(*card)], unsafe_allow_html=True)
+    lap("history")
+
+    # 메인 카드 섹션
+    st.write("")
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown(DECK_HTML.format(len(game.deck)), unsafe_allow_html=True)
+    with c2:
+        st.markdown(MAIN_CARD_HTML[cur_code], unsafe_allow_html=True)
+    lap("main_card")
+
+@st.fragment(key=CONTROLS_FRAGMENT)
+def controls():
+    lap = metrics.laps()
+    st.markdown(f"<div class='info-msg'>{game.message}</div>", unsafe_allow_html=True)
+
+    # 베팅 컨트롤
+    o1, o2 = game.calculate_odds()
+    label_1 = "Over (Same)" if game.current_card[0] < 14 else "Same (A)"
+    b_col1, b_col2 = st.columns(2)
+    with b_col1:
+        st.markdown('<div class="bet-btn-style">', unsafe_allow_html=True)
+        st.button(f"{label_1}\nx{o1}\nGet: {int(game.current_pot*o1):,}", key="hi", on_click=process_bet, args=("Hi",))
+        st.button(f"Black (♠♣)\nx1.95\nGet: {int(game.current_pot*ODDS_FIXED):,}", key="bl", on_click=process_bet, args=("Black",))
+        st.markdown('</div>', unsafe_allow_html=True)
+    with b_col2:
+        st.markdown('<div class="bet-btn-style">', unsafe_allow_html=True)
+        st.button(f"Under\nx{o2}\nGet: {int(game.current_pot*o2):,}", key="lo", on_click=process_bet, args=("Lo",))
+        st.button(f"Red (♥♦)\nx1.95\nGet: {int(game.current_pot*ODDS_FIXED):,}", key="re", on_click=process_bet, args=("Red",))
         st.markdown('</div>', unsafe_allow_html=True)
 
-# 보유 머니
-st.markdown(f"""
-<div class='balance-box'>
-    <span style='color:#aaa; font-size:0.8rem;'>보유 머니 (Balance)</span><br>
-    <span style='font-size:1.8rem; color:#4CAF50; font-weight:bold;'>₩ {st.session_state.balance:,}</span>
-</div>
-""", unsafe_allow_html=True)
+    # 인출 버튼
+    st.markdown('<div class="cashout-btn-style">', unsafe_allow_html=True)
+    st.button(f"₩ {game.current_pot:,} IN CHUL (인출)", on_click=cash_out)
+    st.markdown('</div>', unsafe_allow_html=True)
+    lap("betting_controls")
+
+    # 칩 섹션
+    st.markdown("<p style='text-align:center; font-size:0.75rem; margin:0;'>칩을 눌러 베팅금 추가</p>", unsafe_allow_html=True)
+    chip_cols = st.columns(6)
+    for i, amt in enumerate([1000, 5000, 10000, 50000, 100000, 500000]):
+        with chip_cols[i]:
+            st.markdown('<div class="chip-btn-style">', unsafe_allow_html=True)
+            st.button(f"+{amt//1000}k", key=f"c_{amt}", on_click=add_chip, args=(amt,))
+            st.markdown('</div>', unsafe_allow_html=True)
+    lap("chips")
+
+    # 보유 머니
+    st.markdown(BALANCE_HTML.format(game.balance), unsafe_allow_html=True)
+    lap("balance")
+
+table()
+controls()